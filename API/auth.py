@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from .. import models, schemas
+from .. import models, schemas, user_cache
 from ..database import get_db
+from ..instrumentation import InstrumentedRoute
 
 router = APIRouter(
     prefix="/auth",
-    tags=["Auth"]
+    tags=["Auth"],
+    route_class=InstrumentedRoute
 )
 
 from sqlalchemy.sql import func   # add this at the top of the file
@@ -19,6 +21,9 @@ def login_user(data: schemas.UserCreate, db: Session = Depends(get_db)):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    # keep the write endpoints' cache warm for this user
+    user_cache.remember(user)
+
     if user.password != data.password:
         raise HTTPException(status_code=401, detail="Invalid password")
 
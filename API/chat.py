@@ -1,18 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional, Union
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from .. import models, schemas
-from ..database import get_db
+from .. import models, schemas, conversations, counters, serialization
+from ..conversations import conversation_key
+from ..database import get_async_db, get_async_read_db, get_db, get_read_db
+from ..realtime import hub
+from ..instrumentation import InstrumentedRoute
 
 router = APIRouter(
     prefix="/chat",
-    tags=["Chat"]
+    tags=["Chat"],
+    route_class=InstrumentedRoute
 )
 
-# SEND MESSAGE
-@router.post("/send", response_model=schemas.ChatMessageOut)
-def send_message(msg: schemas.ChatMessageCreate, db: Session = Depends(get_db)):
+CONVERSATION_PAGE_SIZE = 50
+CONVERSATION_MAX_PAGE_SIZE = 200
+INBOX_PAGE_SIZE = 20
+INBOX_MAX_PAGE_SIZE = 100
+
+
+def message_to_dict(m: models.ChatMessage) -> dict:
+    return {
+        "id": m.id,
+        "sender": m.sender,
+        "receiver": m.receiver,
+        "message": m.message,
+        "timestamp": m.timestamp,
+        "isVoice": m.isVoice,
+        "emoji": m.emoji,
+        "isRead": m.isRead
+    }
 
+
+def save_message(db: Session, msg: schemas.ChatMessageCreate) -> models.ChatMessage:
     new_msg = models.ChatMessage(
         sender=msg.sender,
         receiver=msg.receiver,
@@ -20,95 +44,210 @@ def send_message(msg: schemas.ChatMessageCreate, db: Session = Depends(get_db)):
         timestamp=msg.timestamp,
         isVoice=msg.isVoice,
         emoji=msg.emoji,
-        isRead=False
+        isRead=False,
+        conversationKey=conversation_key(msg.sender, msg.receiver)
     )
 
     db.add(new_msg)
+    db.flush()
+
+    # 📥 keep both inboxes up to date in the same transaction
+    conversations.record_message(db, new_msg)
+
     db.commit()
     db.refresh(new_msg)
 
+    counters.record_rows("messages")
+
+    # 📡 push to both participants' open sockets
+    hub.publish(
+        [new_msg.sender, new_msg.receiver],
+        {"type": "message", "message": message_to_dict(new_msg)}
+    )
+
     return new_msg
 
 
+def send(db: Session, msg: schemas.ChatMessageCreate):
+
+    # 🔒 receiver doesn't follow the sender back → chat request, not a message
+    # (a primary-key probe on follows: the in-memory follow graph only sees
+    # other workers' follows and unfollows at its next reload)
+    follows_back = db.query(
+        select(models.Follow.followerUsername).where(
+            models.Follow.followerUsername == msg.receiver,
+            models.Follow.followedUsername == msg.sender
+        ).exists()
+    ).scalar()
+
+    if not follows_back:
+        existing_request = db.query(models.ChatRequest).filter(
+            models.ChatRequest.sender == msg.sender,
+            models.ChatRequest.receiver == msg.receiver
+        ).first()
+
+        if not existing_request:
+            req = models.ChatRequest(
+                sender=msg.sender,
+                receiver=msg.receiver,
+                timestamp=msg.timestamp
+            )
+            db.add(req)
+            db.commit()
+            counters.record_rows("chat_requests")
+
+        return {
+            "status": "request_pending",
+            "message": "Chat request sent"
+        }
+
+    return save_message(db, msg)
+
+
+# SEND MESSAGE
+@router.post("/send", response_model=Union[schemas.ChatMessageOut, schemas.ChatRequestPending])
+async def send_message(msg: schemas.ChatMessageCreate, db: AsyncSession = Depends(get_async_db)):
+
+    return await db.run_sync(send, msg)
+
+
 # GET CONVERSATION BETWEEN TWO USERS
+# no paging params -> full history (old clients)
+# since_id         -> messages newer than the last one the client has
+# before_id        -> older page ending just before the first one it has
+# limit only       -> latest page
 @router.get("/conversation")
-def get_conversation(user1: str, user2: str, db: Session = Depends(get_db)):
-
-    msgs = db.query(models.ChatMessage).filter(
-        (
-            (models.ChatMessage.sender == user1) &
-            (models.ChatMessage.receiver == user2)
-        ) |
-        (
-            (models.ChatMessage.sender == user2) &
-            (models.ChatMessage.receiver == user1)
-        )
-    ).order_by(models.ChatMessage.timestamp.asc()).all()
-
-    return [
-        {
-            "id": m.id,
-            "sender": m.sender,
-            "receiver": m.receiver,
-            "message": m.message,
-            "timestamp": m.timestamp,
-            "isVoice": m.isVoice,
-            "emoji": m.emoji,
-            "isRead": m.isRead
-        }
-        for m in msgs
-    ]
+async def get_conversation(
+    user1: str,
+    user2: str,
+    since_id: Optional[int] = None,
+    before_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=CONVERSATION_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+
+    if serialization.enabled("conversation"):
+        messages = await db.run_sync(read_conversation, user1, user2, since_id, before_id, limit, True)
+        return serialization.FastJSONResponse(messages)
+
+    return await db.run_sync(read_conversation, user1, user2, since_id, before_id, limit)
+
+
+def read_conversation(
+    db: Session,
+    user1: str,
+    user2: str,
+    since_id: Optional[int],
+    before_id: Optional[int],
+    limit: Optional[int],
+    fast: bool = False
+) -> list[dict]:
+
+    # fast: column rows (serialization.MESSAGE_COLUMNS), message_to_dict reads both
+    selected = serialization.MESSAGE_COLUMNS if fast else (models.ChatMessage,)
+
+    query = db.query(*selected).filter(
+        models.ChatMessage.conversationKey == conversation_key(user1, user2)
+    )
+
+    if since_id is None and before_id is None and limit is None:
+        msgs = query.order_by(models.ChatMessage.timestamp.asc()).all()
+
+    elif since_id is not None:
+        msgs = query.filter(
+            models.ChatMessage.id > since_id
+        ).order_by(models.ChatMessage.id.asc()).limit(limit or CONVERSATION_PAGE_SIZE).all()
+
+    else:
+        if before_id is not None:
+            query = query.filter(models.ChatMessage.id < before_id)
+
+        msgs = query.order_by(
+            models.ChatMessage.id.desc()
+        ).limit(limit or CONVERSATION_PAGE_SIZE).all()
+        msgs.reverse()
 
+    return [message_to_dict(m) for m in msgs]
 
-# LIST USERS YOU HAVE CHATS WITH
+
+# LIST USERS YOU HAVE CHATS WITH (most recent first)
 @router.get("/conversations/{username}")
-def get_conversations(username: str, db: Session = Depends(get_db)):
+def get_conversations(username: str, db: Session = Depends(get_read_db)):
 
-    msgs = db.query(models.ChatMessage).filter(
-        (models.ChatMessage.sender == username) |
-        (models.ChatMessage.receiver == username)
+    rows = db.query(models.ConversationSummary.partnerUsername).filter(
+        models.ConversationSummary.ownerUsername == username
+    ).order_by(
+        models.ConversationSummary.lastTimestamp.desc(),
+        models.ConversationSummary.lastMessageId.desc()
     ).all()
 
-    users = set()
+    return [r.partnerUsername for r in rows]
 
-    for m in msgs:
-        if m.sender != username:
-            users.add(m.sender)
-        if m.receiver != username:
-            users.add(m.receiver)
 
-    return list(users)
+# INBOX: one summary per conversation, most recent first
+@router.get("/inbox/{username}", response_model=schemas.InboxPage)
+async def get_inbox(
+    username: str,
+    before: Optional[str] = None,
+    limit: int = Query(INBOX_PAGE_SIZE, ge=1, le=INBOX_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    return await db.run_sync(conversations.read_inbox, username, before, limit)
 
 
 # GET UNREAD MESSAGE COUNT FOR A CONVERSATION
 @router.get("/unread")
-def unread_count(sender: str, receiver: str, db: Session = Depends(get_db)):
+async def unread_count(sender: str, receiver: str, db: AsyncSession = Depends(get_async_read_db)):
 
-    count = db.query(models.ChatMessage).filter(
-        models.ChatMessage.sender == sender,
-        models.ChatMessage.receiver == receiver,
-        models.ChatMessage.isRead == False
-    ).count()
+    return {"unread": await db.run_sync(conversations.unread_count, receiver, sender)}
 
-    return {"unread": count}
 
+# GET TOTAL UNREAD MESSAGES (badge)
+@router.get("/unread/total/{username}")
+async def unread_total(username: str, db: AsyncSession = Depends(get_async_read_db)):
 
-# MARK ALL MESSAGES AS READ
+    return {"unread": await db.run_sync(conversations.unread_total, username)}
+
+
+# MARK MESSAGES AS READ
+# upToId: only messages up to this id (what the client has actually shown)
 @router.post("/mark-read")
-def mark_read(sender: str, receiver: str, db: Session = Depends(get_db)):
+async def mark_read(
+    sender: str,
+    receiver: str,
+    upToId: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+
+    return await db.run_sync(mark_conversation_read, sender, receiver, upToId)
+
 
-    msgs = db.query(models.ChatMessage).filter(
+def mark_conversation_read(db: Session, sender: str, receiver: str, upToId: Optional[int]) -> dict:
+
+    query = db.query(models.ChatMessage).filter(
+        models.ChatMessage.conversationKey == conversation_key(sender, receiver),
         models.ChatMessage.sender == sender,
         models.ChatMessage.receiver == receiver,
         models.ChatMessage.isRead == False
-    ).all()
+    )
+
+    if upToId is not None:
+        query = query.filter(models.ChatMessage.id <= upToId)
 
-    for msg in msgs:
-        msg.isRead = True
+    # one UPDATE ... WHERE, no rows loaded into the session
+    marked = query.update({"isRead": True}, synchronize_session=False)
 
+    conversations.mark_read(db, receiver, sender, marked)
     db.commit()
 
-    return {"message": "Marked as read"}
+    # 📡 read receipt for the sender, sync for the reader's other devices
+    if marked:
+        hub.publish(
+            [sender, receiver],
+            {"type": "read", "sender": sender, "receiver": receiver, "upToId": upToId, "marked": marked}
+        )
+
+    return {"message": "Marked as read", "marked": marked}
 
 
 # UPDATE EMOJI REACTION
@@ -121,97 +260,19 @@ def react_to_message(messageId: int, emoji: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Message not found")
 
     msg.emoji = emoji
+    conversations.record_reaction(db, msg)
     db.commit()
     db.refresh(msg)
 
-    return {"message": "Emoji updated", "id": msg.id, "emoji": msg.emoji}
-
-@router.post("/send")
-def send_message(msg: schemas.ChatMessageCreate, db: Session = Depends(get_db)):
-
-    # Check if receiver follows sender
-    follows_back = db.query(models.Follow).filter(
-        models.Follow.followerUsername == msg.receiver,
-        models.Follow.followedUsername == msg.sender
-    ).first()
-
-    # If NOT following back → create request
-    if not follows_back:
-        existing_request = db.query(models.ChatRequest).filter(
-            models.ChatRequest.sender == msg.sender,
-            models.ChatRequest.receiver == msg.receiver
-        ).first()
-
-        if not existing_request:
-            req = models.ChatRequest(
-                sender=msg.sender,
-                receiver=msg.receiver,
-                timestamp=msg.timestamp
-            )
-            db.add(req)
-            db.commit()
-
-        return {
-            "status": "request_pending",
-            "message": "Chat request sent"
-        }
-
-    # Else → normal message
-    new_msg = models.ChatMessage(
-        sender=msg.sender,
-        receiver=msg.receiver,
-        message=msg.message,
-        timestamp=msg.timestamp,
-        isVoice=msg.isVoice,
-        emoji=msg.emoji,
-        isRead=False
+    hub.publish(
+        [msg.sender, msg.receiver],
+        {"type": "reaction", "id": msg.id, "emoji": msg.emoji}
     )
 
-    db.add(new_msg)
-    db.commit()
-    db.refresh(new_msg)
-
-    return new_msg
-
-
-    # check if receiver follows sender
-    follows_back = db.query(models.Follow).filter(
-        models.Follow.followerUsername == msg.receiver,
-        models.Follow.followedUsername == msg.sender
-    ).first()
-
-    if not follows_back:
-        # create chat request if not exists
-        existing = db.query(models.ChatRequest).filter(
-            models.ChatRequest.sender == msg.sender,
-            models.ChatRequest.receiver == msg.receiver
-        ).first()
-
-        if not existing:
-            req = models.ChatRequest(
-                sender=msg.sender,
-                receiver=msg.receiver,
-                timestamp=msg.timestamp
-            )
-            db.add(req)
-            db.commit()
-
-        return {"status": "request_pending"}
-
-    # else → save message normally
-    message = models.ChatMessage(
-        sender=msg.sender,
-        receiver=msg.receiver,
-        message=msg.message,
-        timestamp=msg.timestamp
-    )
-    db.add(message)
-    db.commit()
-    db.refresh(message)
+    return {"message": "Emoji updated", "id": msg.id, "emoji": msg.emoji}
 
-    return message
 @router.get("/requests/{username}")
-def get_chat_requests(username: str, db: Session = Depends(get_db)):
+def get_chat_requests(username: str, db: Session = Depends(get_read_db)):
 
     return db.query(models.ChatRequest).filter(
         models.ChatRequest.receiver == username,
@@ -258,5 +319,6 @@ def delete_chat_request(sender: str, receiver: str, db: Session = Depends(get_db
     if req:
         db.delete(req)
         db.commit()
+        counters.record_rows("chat_requests", -1)
 
     return {"message": "Chat request removed"}
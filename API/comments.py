@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models import Comment, Post
 from ..schemas import CommentCreate, CommentOut
-from .. import models
+from .. import models, counters, user_cache, serialization
+from ..instrumentation import InstrumentedRoute
 
-router = APIRouter(prefix="/comments", tags=["Comments"])
+router = APIRouter(prefix="/comments", tags=["Comments"], route_class=InstrumentedRoute)
 
 # -----------------------------
 # 🔹 Create Comment
@@ -13,14 +14,12 @@ router = APIRouter(prefix="/comments", tags=["Comments"])
 @router.post("/", response_model=CommentOut)
 def create_comment(comment: CommentCreate, db: Session = Depends(get_db)):
     # 🔍 Check if post exists
-    post = db.query(Post).filter(Post.id == comment.postId).first()
+    post = db.query(Post.id).filter(Post.id == comment.postId).first()
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
     # 🔍 Check user
-    user = db.query(models.User).filter(
-        models.User.username == comment.username
-    ).first()
+    user = user_cache.get_user_state(db, comment.username)
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -40,19 +39,26 @@ def create_comment(comment: CommentCreate, db: Session = Depends(get_db)):
     )
 
     db.add(new_comment)
-
-    # ✅ Increase comment count safely
-    post.commentCount += 1
-
+    # 🔢 commentCount is folded into posts by the counter flusher
+    counters.record(db, comment.postId, comments=1)
     db.commit()
     db.refresh(new_comment)
+
+    counters.record_rows("comments")
+
     return new_comment
 
 # -----------------------------
 # 🔹 Get Comments for a Post
 # -----------------------------
 @router.get("/{post_id}", response_model=list[CommentOut])
-def get_comments(post_id: int, db: Session = Depends(get_db)):
+def get_comments(post_id: int, db: Session = Depends(get_read_db)):
+    if serialization.enabled("comments"):
+        rows = db.query(*serialization.COMMENT_COLUMNS).filter(Comment.postId == post_id).all()
+        return serialization.FastJSONResponse(
+            serialization.rows_to_dicts(rows, serialization.COMMENT_COLUMNS)
+        )
+
     return db.query(Comment).filter(Comment.postId == post_id).all()
 
 
@@ -66,12 +72,12 @@ def delete_comment(comment_id: int, db: Session = Depends(get_db)):
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
 
-    # Find the post the comment belongs to
-    post = db.query(Post).filter(Post.id == comment.postId).first()
-    if post:
-        post.commentCount -= 1
+    post_id = comment.postId
 
     db.delete(comment)
+    counters.record(db, post_id, comments=-1)
     db.commit()
 
+    counters.record_rows("comments", -1)
+
     return {"message": "Comment deleted"}
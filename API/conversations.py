@@ -0,0 +1,198 @@
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from . import models
+from .feed import apply_cursor
+
+BACKFILL_CHUNK_SIZE = 1000
+PREVIEW_LENGTH = 100
+
+
+def conversation_key(user1: str, user2: str) -> str:
+    # same key whichever side sent the message
+    first, second = sorted((user1, user2))
+    return f"{first}|{second}"
+
+
+def backfill_conversation_keys(db: Session, chunk_size: int = BACKFILL_CHUNK_SIZE) -> int:
+    # keys are computed in Python so they match conversation_key() exactly,
+    # whatever collation the database compares usernames with
+    updated = 0
+    last_id = 0
+
+    while True:
+        rows = db.query(
+            models.ChatMessage.id,
+            models.ChatMessage.sender,
+            models.ChatMessage.receiver
+        ).filter(
+            models.ChatMessage.id > last_id,
+            models.ChatMessage.conversationKey == None
+        ).order_by(models.ChatMessage.id.asc()).limit(chunk_size).all()
+
+        if not rows:
+            return updated
+
+        db.bulk_update_mappings(models.ChatMessage, [
+            {"id": r.id, "conversationKey": conversation_key(r.sender, r.receiver)}
+            for r in rows
+        ])
+        db.commit()
+
+        updated += len(rows)
+        last_id = rows[-1].id
+
+
+# -------------------------
+# INBOX SUMMARIES
+# -------------------------
+
+def _set_last(row: models.ConversationSummary, msg: models.ChatMessage):
+    row.lastMessageId = msg.id
+    row.lastSender = msg.sender
+    row.lastMessage = (msg.message or "")[:PREVIEW_LENGTH]
+    row.lastTimestamp = msg.timestamp
+    row.lastIsVoice = bool(msg.isVoice)
+    row.lastEmoji = msg.emoji
+
+
+def record_message(db: Session, msg: models.ChatMessage):
+    # msg must already be flushed so it has an id
+    sides = [(msg.sender, msg.receiver, 0)]
+    if msg.receiver != msg.sender:
+        sides.append((msg.receiver, msg.sender, 1))
+
+    for owner, partner, unread in sides:
+        row = db.get(models.ConversationSummary, (owner, partner))
+
+        if row is None:
+            row = models.ConversationSummary(
+                ownerUsername=owner,
+                partnerUsername=partner,
+                unreadCount=unread
+            )
+            db.add(row)
+        elif unread:
+            row.unreadCount = models.ConversationSummary.unreadCount + unread
+
+        _set_last(row, msg)
+
+    if len(sides) > 1:
+        _add_unread_total(db, msg.receiver, 1)
+
+
+def _add_unread_total(db: Session, username: str, delta: int):
+    row = db.get(models.ChatUnreadTotal, username)
+
+    if row is None:
+        db.add(models.ChatUnreadTotal(username=username, unreadCount=max(delta, 0)))
+    else:
+        row.unreadCount = models.ChatUnreadTotal.unreadCount + delta
+
+
+def mark_read(db: Session, owner: str, partner: str, marked: int):
+    # marked is the number of messages the bulk update actually flipped
+    if not marked:
+        return
+
+    db.query(models.ConversationSummary).filter(
+        models.ConversationSummary.ownerUsername == owner,
+        models.ConversationSummary.partnerUsername == partner
+    ).update(
+        {"unreadCount": models.ConversationSummary.unreadCount - marked},
+        synchronize_session=False
+    )
+
+    _add_unread_total(db, owner, -marked)
+
+
+def unread_count(db: Session, owner: str, partner: str) -> int:
+    row = db.get(models.ConversationSummary, (owner, partner))
+    return max(row.unreadCount or 0, 0) if row else 0
+
+
+def unread_total(db: Session, username: str) -> int:
+    row = db.get(models.ChatUnreadTotal, username)
+    return max(row.unreadCount or 0, 0) if row else 0
+
+
+def record_reaction(db: Session, msg: models.ChatMessage):
+    # only the preview of the latest message shows a reaction
+    db.query(models.ConversationSummary).filter(
+        models.ConversationSummary.ownerUsername.in_([msg.sender, msg.receiver]),
+        models.ConversationSummary.partnerUsername.in_([msg.sender, msg.receiver]),
+        models.ConversationSummary.lastMessageId == msg.id
+    ).update({"lastEmoji": msg.emoji}, synchronize_session=False)
+
+
+def read_inbox(db: Session, username: str, before: Optional[str], limit: int) -> dict:
+    query = db.query(models.ConversationSummary).filter(
+        models.ConversationSummary.ownerUsername == username
+    )
+
+    rows = apply_cursor(
+        query,
+        before,
+        models.ConversationSummary.lastTimestamp,
+        models.ConversationSummary.lastMessageId
+    ).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = f"{rows[-1].lastTimestamp or 0}_{rows[-1].lastMessageId or 0}"
+
+    return {"items": rows, "nextCursor": next_cursor}
+
+
+def rebuild_summaries(db: Session, chunk_size: int = BACKFILL_CHUNK_SIZE) -> int:
+    # recompute every summary and unread badge from the messages table,
+    # scanning it in id order
+    summaries = {}
+    last_id = 0
+
+    while True:
+        msgs = db.query(models.ChatMessage).filter(
+            models.ChatMessage.id > last_id
+        ).order_by(models.ChatMessage.id.asc()).limit(chunk_size).all()
+
+        if not msgs:
+            break
+
+        for m in msgs:
+            sides = [(m.sender, m.receiver, 0)]
+            if m.receiver != m.sender:
+                sides.append((m.receiver, m.sender, 0 if m.isRead else 1))
+
+            for owner, partner, unread in sides:
+                row = summaries.get((owner, partner))
+                if row is None:
+                    row = models.ConversationSummary(
+                        ownerUsername=owner,
+                        partnerUsername=partner,
+                        unreadCount=0
+                    )
+                    summaries[(owner, partner)] = row
+
+                row.unreadCount += unread
+                _set_last(row, m)
+
+        last_id = msgs[-1].id
+        db.expunge_all()
+
+    totals = {}
+    for row in summaries.values():
+        if row.unreadCount:
+            totals[row.ownerUsername] = totals.get(row.ownerUsername, 0) + row.unreadCount
+
+    db.query(models.ConversationSummary).delete(synchronize_session=False)
+    db.query(models.ChatUnreadTotal).delete(synchronize_session=False)
+    db.add_all(summaries.values())
+    db.add_all(
+        models.ChatUnreadTotal(username=username, unreadCount=count)
+        for username, count in totals.items()
+    )
+    db.commit()
+
+    return len(summaries)
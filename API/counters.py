@@ -0,0 +1,310 @@
+import logging
+import threading
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Like/comment counters are write-behind: routes insert a counter_deltas row
+# in the same transaction as the like/comment, and a background thread folds
+# the deltas into posts every few seconds, so hot posts are updated once per
+# interval instead of once per request. The deltas are in the database, not
+# in one worker's memory, so any process (every worker's flusher, the
+# maintenance job) sees all of them: a flush drains what it locked, and
+# reconcile subtracts whatever is still undrained.
+# Row counts per table (table_stats, read by the BackOffice dashboard) ride
+# the same flush; those are in memory, drift there only affects the dashboard.
+
+FLUSH_INTERVAL_SECONDS = 2
+FLUSH_BATCH_SIZE = 10000
+RECONCILE_INTERVAL_SECONDS = 3600
+RECONCILE_CHUNK_SIZE = 1000
+
+COUNTER_COLUMNS = ("likeCount", "commentCount")
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pending_rows = {}      # table name -> row count delta
+_stop = threading.Event()
+_thread = None
+_flush_listeners = []   # called with (db, batch) inside the flush transaction
+
+
+# -------------------------
+# RECORDING
+# -------------------------
+
+def record(db: Session, post_id: int, likes: int = 0, comments: int = 0):
+    # call before the commit that writes the like/comment row, so both land together
+    db.execute(insert(models.CounterDelta).values(
+        postId=post_id, likeCount=likes, commentCount=comments
+    ))
+
+
+def drop_post(db: Session, post_id: int):
+    # undrained deltas of a post being deleted, same transaction
+    db.query(models.CounterDelta).filter(
+        models.CounterDelta.postId == post_id
+    ).delete(synchronize_session=False)
+
+
+def pending_sum(column, post_id):
+    # undrained deltas of one post, as a scalar subquery (post_id may be a column)
+    return select(func.coalesce(func.sum(column), 0)).where(
+        models.CounterDelta.postId == post_id
+    ).scalar_subquery()
+
+
+def record_rows(table: str, delta: int = 1):
+    # call after the commit that inserted/deleted the rows
+    with _lock:
+        _pending_rows[table] = _pending_rows.get(table, 0) + delta
+
+
+def _take_pending_rows() -> dict:
+    global _pending_rows
+    with _lock:
+        rows, _pending_rows = _pending_rows, {}
+    return rows
+
+
+def _restore_pending_rows(rows: dict):
+    with _lock:
+        for table, delta in rows.items():
+            _pending_rows[table] = _pending_rows.get(table, 0) + delta
+
+
+# -------------------------
+# FLUSH
+# -------------------------
+
+def add_flush_listener(callback):
+    # derived data fed by like/comment deltas (e.g. trending scores) hooks in here
+    _flush_listeners.append(callback)
+
+
+def upsert_add(db: Session, table, keys: dict, column: str, delta, extra: dict = None):
+    # single-statement "insert or add to" so concurrent writers can't race on a new row;
+    # extra columns are only written when the row is inserted
+    values = {**keys, **(extra or {}), column: delta}
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "mysql":
+        stmt = mysql.insert(table).values(**values).on_duplicate_key_update(
+            {column: table.c[column] + delta}
+        )
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(table).values(**values).on_conflict_do_update(
+            index_elements=list(keys),
+            set_={column: table.c[column] + delta}
+        )
+    else:
+        updated = db.execute(
+            update(table)
+            .where(*(table.c[k] == v for k, v in keys.items()))
+            .values({column: table.c[column] + delta})
+        ).rowcount
+        if updated:
+            return
+        stmt = insert(table).values(**values)
+
+    db.execute(stmt)
+
+
+def _drain(db: Session) -> tuple[dict, list[int]]:
+    # locking read: a concurrent flusher (another worker) waits for this
+    # transaction and then no longer sees the rows it deleted
+    deltas = db.query(
+        models.CounterDelta.id,
+        models.CounterDelta.postId,
+        models.CounterDelta.likeCount,
+        models.CounterDelta.commentCount
+    ).order_by(models.CounterDelta.id.asc()).limit(FLUSH_BATCH_SIZE).with_for_update().all()
+
+    batch = {}
+    for d in deltas:
+        totals = batch.setdefault(d.postId, dict.fromkeys(COUNTER_COLUMNS, 0))
+        totals["likeCount"] += d.likeCount or 0
+        totals["commentCount"] += d.commentCount or 0
+
+    return batch, [d.id for d in deltas]
+
+
+def flush(db: Session) -> int:
+    rows = _take_pending_rows()
+
+    try:
+        batch, delta_ids = _drain(db)
+        if not batch and not rows:
+            db.rollback()
+            return 0
+
+        # posts with the same deltas share one UPDATE ... WHERE id IN (...)
+        groups = {}
+        for post_id, deltas in batch.items():
+            key = tuple(deltas[column] for column in COUNTER_COLUMNS)
+            if any(key):
+                groups.setdefault(key, []).append(post_id)
+
+        for key, post_ids in groups.items():
+            values = {
+                column: getattr(models.Post, column) + delta
+                for column, delta in zip(COUNTER_COLUMNS, key)
+                if delta
+            }
+            db.execute(
+                update(models.Post)
+                .where(models.Post.id.in_(post_ids))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+
+        # only tables already counted once have a row; the BackOffice
+        # creates it with an exact/estimated count on first read
+        for table, delta in rows.items():
+            if delta:
+                db.query(models.TableStat).filter(
+                    models.TableStat.name == table
+                ).update(
+                    {"rowCount": models.TableStat.rowCount + delta},
+                    synchronize_session=False
+                )
+
+        if delta_ids:
+            db.query(models.CounterDelta).filter(
+                models.CounterDelta.id.in_(delta_ids)
+            ).delete(synchronize_session=False)
+
+        for callback in _flush_listeners:
+            callback(db, batch)
+        db.commit()
+    except Exception:
+        # the delta rows are still there for the next flush
+        db.rollback()
+        _restore_pending_rows(rows)
+        raise
+
+    return len(batch)
+
+
+# -------------------------
+# RECONCILIATION
+# -------------------------
+
+def _counts(db: Session, column, post_ids: list[int]) -> dict:
+    rows = db.query(column, func.count()).filter(
+        column.in_(post_ids)
+    ).group_by(column).all()
+    return dict(rows)
+
+
+def _undrained(db: Session, post_ids: list[int]) -> dict:
+    rows = db.query(
+        models.CounterDelta.postId,
+        func.sum(models.CounterDelta.likeCount),
+        func.sum(models.CounterDelta.commentCount)
+    ).filter(
+        models.CounterDelta.postId.in_(post_ids)
+    ).group_by(models.CounterDelta.postId).all()
+    return {post_id: (likes or 0, comments or 0) for post_id, likes, comments in rows}
+
+
+def reconcile(db: Session, chunk_size: int = RECONCILE_CHUNK_SIZE) -> int:
+    # recompute counters from post_likes / comments, one chunk of posts at a time;
+    # posts must hold the rows counted minus the deltas nobody has drained yet
+    fixed = 0
+    last_id = 0
+
+    while True:
+        posts = db.query(
+            models.Post.id, models.Post.likeCount, models.Post.commentCount
+        ).filter(
+            models.Post.id > last_id
+        ).order_by(models.Post.id.asc()).limit(chunk_size).all()
+
+        if not posts:
+            return fixed
+
+        post_ids = [p.id for p in posts]
+        likes = _counts(db, models.PostLike.postId, post_ids)
+        comments = _counts(db, models.Comment.postId, post_ids)
+        undrained = _undrained(db, post_ids)
+
+        wrong = []
+        for p in posts:
+            pending_likes, pending_comments = undrained.get(p.id, (0, 0))
+            like_count = likes.get(p.id, 0) - pending_likes
+            comment_count = comments.get(p.id, 0) - pending_comments
+
+            if (p.likeCount, p.commentCount) != (like_count, comment_count):
+                wrong.append(p.id)
+
+        if wrong:
+            # recount inside the UPDATE itself, so a like or flush committed
+            # since the reads above is not overwritten with older numbers
+            like_rows = select(func.count()).where(
+                models.PostLike.postId == models.Post.id
+            ).scalar_subquery()
+            comment_rows = select(func.count()).where(
+                models.Comment.postId == models.Post.id
+            ).scalar_subquery()
+
+            db.query(models.Post).filter(models.Post.id.in_(wrong)).update({
+                "likeCount": like_rows - pending_sum(models.CounterDelta.likeCount, models.Post.id),
+                "commentCount": comment_rows - pending_sum(models.CounterDelta.commentCount, models.Post.id),
+            }, synchronize_session=False)
+            fixed += len(wrong)
+
+        db.commit()
+        last_id = post_ids[-1]
+
+
+# -------------------------
+# BACKGROUND FLUSHER
+# -------------------------
+
+def _run(session_factory):
+    waited = 0
+
+    while not _stop.wait(FLUSH_INTERVAL_SECONDS):
+        db = session_factory()
+        try:
+            flush(db)
+
+            waited += FLUSH_INTERVAL_SECONDS
+            if waited >= RECONCILE_INTERVAL_SECONDS:
+                waited = 0
+                reconcile(db)
+        except Exception:
+            logger.exception("counter flush failed")
+        finally:
+            db.close()
+
+
+def start(session_factory):
+    global _thread
+    if _thread is not None:
+        return
+
+    _stop.clear()
+    _thread = threading.Thread(target=_run, args=(session_factory,), daemon=True)
+    _thread.start()
+
+
+def stop(session_factory):
+    global _thread
+    _stop.set()
+
+    if _thread is not None:
+        _thread.join()
+        _thread = None
+
+    # last flush so nothing recorded before shutdown is lost
+    db = session_factory()
+    try:
+        flush(db)
+    finally:
+        db.close()
@@ -1,13 +1,87 @@
+import os
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-# Using MySQL with root user and NO password
-SQLALCHEMY_DATABASE_URL = "mysql+mysqlconnector://root@localhost/socialnetwork"
+# Connection settings come from the environment so workers can be tuned
+# without code changes; the defaults are the old local setup
+# (MySQL with root user and NO password).
+SQLALCHEMY_DATABASE_URL = os.getenv(
+    "DATABASE_URL", "mysql+mysqlconnector://root@localhost/socialnetwork"
+)
+
+# GET routes read from here (point it at a replica); same database when unset
+SQLALCHEMY_READ_DATABASE_URL = os.getenv("DATABASE_READ_URL", SQLALCHEMY_DATABASE_URL)
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))                  # connections kept open per engine
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))           # extra connections under load
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))           # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))         # seconds, keep below MySQL wait_timeout
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"        # test connections before use
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))     # seconds to open a new connection
+
+# name of the connect timeout argument per DBAPI driver
+CONNECT_TIMEOUT_ARGS = {
+    "mysqlconnector": "connection_timeout",
+    "pymysql": "connect_timeout",
+    "mysqldb": "connect_timeout",
+    "aiomysql": "connect_timeout",
+}
+
+# async driver per backend, for the async routes (see get_async_db)
+ASYNC_DRIVERS = {
+    "mysql": "aiomysql",
+    "sqlite": "aiosqlite",
+}
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL
+
+def to_async_url(url: str) -> str:
+    u = make_url(url)
+    backend = u.get_backend_name()
+    return u.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+SQLALCHEMY_ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL", to_async_url(SQLALCHEMY_DATABASE_URL)
 )
+SQLALCHEMY_ASYNC_READ_DATABASE_URL = os.getenv(
+    "ASYNC_READ_DATABASE_URL", to_async_url(SQLALCHEMY_READ_DATABASE_URL)
+)
+
+
+def make_engine(url: str, factory=create_engine):
+    driver = make_url(url).get_driver_name()
+
+    if url.startswith("sqlite"):
+        # local testing stand-in: sync sessions are used from the threadpool
+        if driver == "aiosqlite":
+            return factory(url)
+        return factory(url, connect_args={"check_same_thread": False})
+
+    connect_args = {}
+    if driver in CONNECT_TIMEOUT_ARGS:
+        connect_args[CONNECT_TIMEOUT_ARGS[driver]] = DB_CONNECT_TIMEOUT
+
+    return factory(
+        url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args=connect_args
+    )
+
+
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
+
+if SQLALCHEMY_READ_DATABASE_URL == SQLALCHEMY_DATABASE_URL:
+    read_engine = engine
+else:
+    read_engine = make_engine(SQLALCHEMY_READ_DATABASE_URL)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -15,6 +89,36 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=read_engine
+)
+
+# -------------------------
+# ASYNC (hot routes: feed, chat, notifications, likes)
+# -------------------------
+async_engine = make_engine(SQLALCHEMY_ASYNC_DATABASE_URL, create_async_engine)
+
+if SQLALCHEMY_ASYNC_READ_DATABASE_URL == SQLALCHEMY_ASYNC_DATABASE_URL:
+    async_read_engine = async_engine
+else:
+    async_read_engine = make_engine(SQLALCHEMY_ASYNC_READ_DATABASE_URL, create_async_engine)
+
+# objects stay loaded after commit: response models are built outside the
+# session, where an expired attribute could not be reloaded
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
 
 def get_db():
@@ -23,3 +127,45 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    # for GET routes only: may lag behind writes when it is a replica
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    # shared sync helpers run on it through `await db.run_sync(fn, ...)`
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+def pool_status() -> dict:
+    engines = {"write": engine, "async write": async_engine.sync_engine}
+    if read_engine is not engine:
+        engines["read"] = read_engine
+    if async_read_engine is not async_engine:
+        engines["async read"] = async_read_engine.sync_engine
+
+    status = {}
+    for name, e in engines.items():
+        pool = e.pool
+        status[name] = {
+            "pool": type(pool).__name__,
+            "size": pool.size() if hasattr(pool, "size") else None,
+            "checkedIn": pool.checkedin() if hasattr(pool, "checkedin") else None,
+            "checkedOut": pool.checkedout() if hasattr(pool, "checkedout") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            "status": pool.status(),
+        }
+
+    return status
@@ -0,0 +1,34 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from .. import schemas, trending
+from ..database import get_read_db
+from ..feed import liked_post_ids
+from ..instrumentation import InstrumentedRoute
+
+TRENDING_PAGE_SIZE = 20
+TRENDING_MAX_PAGE_SIZE = 100
+
+router = APIRouter(
+    prefix="/explore",
+    tags=["Explore"],
+    route_class=InstrumentedRoute
+)
+
+
+# TRENDING POSTS (time-decayed leaderboard)
+@router.get("/trending", response_model=list[schemas.PostOut])
+def get_trending_posts(
+    viewer: Optional[str] = None,
+    limit: int = Query(TRENDING_PAGE_SIZE, ge=1, le=TRENDING_MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db)
+):
+    posts = trending.top_posts(db, limit)
+
+    liked = liked_post_ids(db, viewer, [p.id for p in posts])
+    for p in posts:
+        p.isLiked = p.id in liked
+
+    return posts
@@ -0,0 +1,102 @@
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from . import models, serialization
+
+FEED_PAGE_SIZE = 20
+FEED_MAX_PAGE_SIZE = 100
+
+
+# -------------------------
+# LIKE STATE
+# -------------------------
+
+def liked_post_ids(db: Session, username: str, post_ids: list[int]) -> set[int]:
+    # one IN (...) lookup for the whole page instead of a query per post
+    if not post_ids or not username:
+        return set()
+
+    rows = db.query(models.PostLike.postId).filter(
+        models.PostLike.username == username,
+        models.PostLike.postId.in_(post_ids)
+    ).all()
+
+    return {r.postId for r in rows}
+
+
+# -------------------------
+# (timestamp, id) CURSOR
+# -------------------------
+
+def encode_cursor(post) -> str:
+    return f"{post.timestamp or 0}_{post.id}"
+
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    try:
+        timestamp, post_id = cursor.split("_", 1)
+        return int(timestamp), int(post_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def apply_cursor(query, before: Optional[str], timestamp_col=None, id_col=None):
+    # keyset pagination, newest first; defaults to ix_posts_timestamp_id
+    timestamp_col = timestamp_col if timestamp_col is not None else models.Post.timestamp
+    id_col = id_col if id_col is not None else models.Post.id
+
+    if before:
+        timestamp, post_id = decode_cursor(before)
+        query = query.filter(
+            or_(
+                timestamp_col < timestamp,
+                and_(timestamp_col == timestamp, id_col < post_id)
+            )
+        )
+
+    return query.order_by(timestamp_col.desc(), id_col.desc())
+
+
+# -------------------------
+# PAGES
+# -------------------------
+
+def split_page(rows: list, limit: int) -> tuple[list, Optional[str]]:
+    # rows holds up to limit + 1 rows; the extra one only signals a next page
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+def page_posts(db: Session, posts: list, username: str, limit: int) -> dict:
+    posts, next_cursor = split_page(posts, limit)
+
+    liked = liked_post_ids(db, username, [p.id for p in posts])
+    for p in posts:
+        p.isLiked = p.id in liked
+
+    return {"items": posts, "nextCursor": next_cursor}
+
+
+def page_post_rows(db: Session, rows: list, username: str, limit: int) -> dict:
+    # same page from serialization.POST_COLUMNS rows, as plain dicts
+    rows, next_cursor = split_page(rows, limit)
+
+    liked = liked_post_ids(db, username, [r.id for r in rows])
+
+    return {"items": serialization.post_dicts(rows, liked), "nextCursor": next_cursor}
+
+
+def build_page(db: Session, query, username: str, before: Optional[str], limit: int) -> dict:
+    posts = apply_cursor(query, before).limit(limit + 1).all()
+    return page_posts(db, posts, username, limit)
+
+
+def build_row_page(db: Session, query, username: str, before: Optional[str], limit: int) -> dict:
+    # query selects serialization.POST_COLUMNS
+    rows = apply_cursor(query, before).limit(limit + 1).all()
+    return page_post_rows(db, rows, username, limit)
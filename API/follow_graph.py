@@ -0,0 +1,299 @@
+import logging
+import threading
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal
+
+# The follow graph in memory, so mutuals and suggestions never query
+# follows. Usernames get dense integer ids; the edges are two CSR
+# arrays (who each user follows, who follows each user), rows sorted so a
+# "does A follow B" check is one binary search inside A's row. Follows and
+# unfollows made by this worker go into small overlay sets on top of the
+# arrays; a background reload rebuilds the arrays from follows every few
+# minutes, which folds the overlay in and picks up other workers' writes.
+# Until then it can be behind them, so checks that gate access (chat, the
+# profile relationship) read follows instead.
+
+RELOAD_INTERVAL_SECONDS = 300
+LOAD_BATCH_SIZE = 50000
+
+SUGGESTIONS_LIMIT = 20
+SUGGESTIONS_MAX_LIMIT = 100
+SUGGESTION_MAX_FOLLOWEES = 1000     # friends-of-friends walks at most this many followees
+
+logger = logging.getLogger(__name__)
+
+
+class Graph:
+
+    def __init__(self, names: list[str], src: np.ndarray, dst: np.ndarray):
+        self.names = names                                  # id -> username
+        self.ids = {name: i for i, name in enumerate(names)}
+        self.size = len(names)                              # nodes covered by the arrays
+
+        self.out_ptr, self.out_idx = _csr(src, dst, self.size)
+        self.in_ptr, self.in_idx = _csr(dst, src, self.size)
+
+        # writes since the arrays were built, id -> set of ids
+        self.added_out, self.added_in = {}, {}
+        self.removed_out, self.removed_in = {}, {}
+
+    def id_of(self, username: str, create: bool = False) -> Optional[int]:
+        i = self.ids.get(username)
+        if i is None and create:
+            i = self.ids[username] = len(self.names)
+            self.names.append(username)
+        return i
+
+    def _row(self, ptr: np.ndarray, idx: np.ndarray, i: int) -> np.ndarray:
+        if i >= self.size:
+            return idx[:0]
+        return idx[ptr[i]:ptr[i + 1]]
+
+    def has(self, a: int, b: int) -> bool:
+        if b in self.removed_out.get(a, ()):
+            return False
+        if b in self.added_out.get(a, ()):
+            return True
+
+        row = self._row(self.out_ptr, self.out_idx, a)
+        j = np.searchsorted(row, b)
+        return bool(j < len(row) and row[j] == b)
+
+    def _neighbours(self, ptr, idx, added: dict, removed: dict, i: int) -> np.ndarray:
+        row = self._row(ptr, idx, i)
+        if i in removed:
+            row = row[~np.isin(row, list(removed[i]))]
+        if i in added:
+            row = np.concatenate([row, np.fromiter(added[i], dtype=row.dtype)])
+        return row
+
+    def following(self, i: int) -> np.ndarray:
+        return self._neighbours(self.out_ptr, self.out_idx, self.added_out, self.removed_out, i)
+
+    def followers(self, i: int) -> np.ndarray:
+        return self._neighbours(self.in_ptr, self.in_idx, self.added_in, self.removed_in, i)
+
+    def follower_counts(self, ids: np.ndarray) -> np.ndarray:
+        # from the arrays only, good enough to rank suggestions
+        degree = np.diff(self.in_ptr)
+        inside = ids < self.size
+        return np.where(inside, degree[np.where(inside, ids, 0)], 0) if self.size else np.zeros_like(ids)
+
+    def add(self, a: int, b: int):
+        if self.has(a, b):
+            return
+        if b in self.removed_out.get(a, ()):
+            self.removed_out[a].discard(b)
+            self.removed_in[b].discard(a)
+        else:
+            self.added_out.setdefault(a, set()).add(b)
+            self.added_in.setdefault(b, set()).add(a)
+
+    def remove(self, a: int, b: int):
+        if not self.has(a, b):
+            return
+        if b in self.added_out.get(a, ()):
+            self.added_out[a].discard(b)
+            self.added_in[b].discard(a)
+        else:
+            self.removed_out.setdefault(a, set()).add(b)
+            self.removed_in.setdefault(b, set()).add(a)
+
+
+def _csr(src: np.ndarray, dst: np.ndarray, size: int) -> tuple[np.ndarray, np.ndarray]:
+    order = np.lexsort((dst, src))
+    ptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=size), out=ptr[1:])
+    return ptr, dst[order].astype(np.int32)
+
+
+_lock = threading.Lock()
+_load_lock = threading.Lock()   # one load at a time, they share the journal
+_graph = None
+_journal = None         # writes seen while a reload is running, replayed onto the new graph
+_stop = threading.Event()
+_thread = None
+
+
+# -------------------------
+# LOADING
+# -------------------------
+
+def build(db: Session) -> Graph:
+    names = [r.username for r in db.query(models.User.username).order_by(models.User.id.asc())]
+    ids = {name: i for i, name in enumerate(names)}
+
+    src, dst = [], []
+    edges = db.query(models.Follow.followerUsername, models.Follow.followedUsername).yield_per(LOAD_BATCH_SIZE)
+    for follower, followed in edges:
+        # follows rows without a users row (deleted account) still count as nodes
+        for name in (follower, followed):
+            if name not in ids:
+                ids[name] = len(names)
+                names.append(name)
+        src.append(ids[follower])
+        dst.append(ids[followed])
+
+    return Graph(names, np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64))
+
+
+def load(db: Session) -> Graph:
+    global _graph, _journal
+
+    with _load_lock:
+        with _lock:
+            _journal = []
+
+        try:
+            graph = build(db)
+        except Exception:
+            with _lock:
+                _journal = None
+            raise
+
+        with _lock:
+            # add/remove are idempotent, replaying a write the load already saw is harmless
+            for op, follower, followed in _journal:
+                _apply(graph, op, follower, followed)
+            _graph = graph
+            _journal = None
+
+    return graph
+
+
+def _current() -> Graph:
+    # lazily loaded if start() was not called (scripts, tests)
+    if _graph is None:
+        with _load_lock:
+            loaded = _graph is not None
+        if not loaded:
+            db = SessionLocal()
+            try:
+                load(db)
+            finally:
+                db.close()
+    return _graph
+
+
+# -------------------------
+# WRITES (called after the follows row is committed)
+# -------------------------
+
+def _apply(graph: Graph, op: str, follower: str, followed: str):
+    a = graph.id_of(follower, create=True)
+    b = graph.id_of(followed, create=True)
+    if op == "add":
+        graph.add(a, b)
+    else:
+        graph.remove(a, b)
+
+
+def _record(op: str, follower: str, followed: str):
+    _current()
+    with _lock:
+        # _graph, not what _current() returned: a reload may have swapped it since
+        _apply(_graph, op, follower, followed)
+        if _journal is not None:
+            _journal.append((op, follower, followed))
+
+
+def add(follower: str, followed: str):
+    _record("add", follower, followed)
+
+
+def remove(follower: str, followed: str):
+    _record("remove", follower, followed)
+
+
+# -------------------------
+# QUERIES
+# -------------------------
+
+def follows(follower: str, followed: str) -> bool:
+    graph = _current()
+    with _lock:
+        a, b = graph.id_of(follower), graph.id_of(followed)
+        return a is not None and b is not None and graph.has(a, b)
+
+
+def mutuals(viewer: str, username: str, limit: Optional[int] = None) -> list[str]:
+    # accounts the viewer follows that also follow username ("followed by ...")
+    graph = _current()
+    with _lock:
+        a, b = graph.id_of(viewer), graph.id_of(username)
+        if a is None or b is None:
+            return []
+
+        common = np.intersect1d(graph.following(a), graph.followers(b))
+        return [graph.names[i] for i in common[:limit]]
+
+
+def suggestions(username: str, limit: int = SUGGESTIONS_LIMIT) -> list[dict]:
+    # friends of friends, ranked by how many of your followees follow them,
+    # then by their own follower count
+    graph = _current()
+    with _lock:
+        a = graph.id_of(username)
+        if a is None:
+            return []
+
+        followees = graph.following(a)
+        if not len(followees):
+            return []
+
+        rows = [graph.following(f) for f in followees[:SUGGESTION_MAX_FOLLOWEES]]
+        candidates, counts = np.unique(np.concatenate(rows), return_counts=True)
+
+        keep = ~np.isin(candidates, followees) & (candidates != a)
+        candidates, counts = candidates[keep], counts[keep]
+
+        order = np.lexsort((-graph.follower_counts(candidates), -counts))[:limit]
+        return [
+            {"username": graph.names[candidates[i]], "mutualCount": int(counts[i])}
+            for i in order
+        ]
+
+
+# -------------------------
+# BACKGROUND RELOAD
+# -------------------------
+
+def _run(session_factory):
+    while not _stop.wait(RELOAD_INTERVAL_SECONDS):
+        db = session_factory()
+        try:
+            load(db)
+        except Exception:
+            logger.exception("follow graph reload failed")
+        finally:
+            db.close()
+
+
+def start(session_factory):
+    global _thread
+    if _thread is not None:
+        return
+
+    db = session_factory()
+    try:
+        load(db)
+    finally:
+        db.close()
+
+    _stop.clear()
+    _thread = threading.Thread(target=_run, args=(session_factory,), daemon=True)
+    _thread.start()
+
+
+def stop():
+    global _thread
+    _stop.set()
+
+    if _thread is not None:
+        _thread.join()
+        _thread = None
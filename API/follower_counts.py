@@ -0,0 +1,87 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from . import models
+
+# users.followerCount / followingCount, kept next to the follows rows:
+# follow and unfollow bump them in the same transaction that writes the
+# follows row, so a profile count is a primary-key read instead of a
+# COUNT(*) over every follower. reconcile() rebuilds them from follows.
+
+RECONCILE_CHUNK_SIZE = 1000
+
+
+def bump(db: Session, follower: str, followed: str, delta: int):
+    # relative UPDATEs, concurrent follows of the same account don't lose counts;
+    # the caller commits together with the follows row
+    db.query(models.User).filter(models.User.username == followed).update(
+        {"followerCount": func.coalesce(models.User.followerCount, 0) + delta},
+        synchronize_session=False
+    )
+    db.query(models.User).filter(models.User.username == follower).update(
+        {"followingCount": func.coalesce(models.User.followingCount, 0) + delta},
+        synchronize_session=False
+    )
+
+
+def follower_count(db: Session, username: str) -> int:
+    return db.query(models.User.followerCount).filter(
+        models.User.username == username
+    ).scalar() or 0
+
+
+def following_count(db: Session, username: str) -> int:
+    return db.query(models.User.followingCount).filter(
+        models.User.username == username
+    ).scalar() or 0
+
+
+# -------------------------
+# REPAIR
+# -------------------------
+
+def _counts(db: Session, column, usernames: list[str]) -> dict[str, int]:
+    rows = db.query(column, func.count()).filter(column.in_(usernames)).group_by(column).all()
+    return {username: n for username, n in rows}
+
+
+def reconcile(db: Session, chunk_size: int = RECONCILE_CHUNK_SIZE) -> int:
+    # recompute both counters from follows, one chunk of users at a time
+    fixed = 0
+    last_id = 0
+
+    while True:
+        users = db.query(
+            models.User.id, models.User.username, models.User.followerCount, models.User.followingCount
+        ).filter(
+            models.User.id > last_id
+        ).order_by(models.User.id.asc()).limit(chunk_size).all()
+
+        if not users:
+            return fixed
+
+        usernames = [u.username for u in users]
+        followers = _counts(db, models.Follow.followedUsername, usernames)
+        following = _counts(db, models.Follow.followerUsername, usernames)
+
+        wrong = [
+            u.id for u in users
+            if (u.followerCount, u.followingCount)
+            != (followers.get(u.username, 0), following.get(u.username, 0))
+        ]
+
+        if wrong:
+            # recount inside the UPDATE itself so a follow committed since the
+            # read above is not overwritten with the older number
+            db.query(models.User).filter(models.User.id.in_(wrong)).update({
+                "followerCount": select(func.count()).where(
+                    models.Follow.followedUsername == models.User.username
+                ).scalar_subquery(),
+                "followingCount": select(func.count()).where(
+                    models.Follow.followerUsername == models.User.username
+                ).scalar_subquery(),
+            }, synchronize_session=False)
+            fixed += len(wrong)
+
+        db.commit()
+        last_id = users[-1].id
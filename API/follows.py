@@ -1,10 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..database import get_db
-from .. import models
-from ..schemas import FollowCreate, FollowOut
+from typing import Optional
 
-router = APIRouter(prefix="/follows", tags=["Follows"])
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..database import get_db, get_read_db
+from .. import models, counters, timeline, follower_counts, follow_graph, profile_cache
+from ..schemas import FollowCreate, FollowOut, FollowBatchRequest, FollowRelationOut
+from ..instrumentation import InstrumentedRoute
+
+router = APIRouter(prefix="/follows", tags=["Follows"], route_class=InstrumentedRoute)
+
+FOLLOW_BATCH_MAX = 100
+
+
+def relations(db: Session, viewer: Optional[str], usernames: list[str]) -> dict[str, dict]:
+    # one statement for the whole list: counts are columns on users, the two
+    # follow directions are primary-key probes into follows
+    is_following = select(models.Follow.followerUsername).where(
+        models.Follow.followerUsername == viewer,
+        models.Follow.followedUsername == models.User.username
+    ).exists()
+
+    is_followed_by = select(models.Follow.followerUsername).where(
+        models.Follow.followerUsername == models.User.username,
+        models.Follow.followedUsername == viewer
+    ).exists()
+
+    rows = db.query(
+        models.User.username,
+        models.User.followerCount,
+        models.User.followingCount,
+        is_following.label("isFollowing"),
+        is_followed_by.label("isFollowedBy")
+    ).filter(models.User.username.in_(usernames)).all()
+
+    found = {r.username: r for r in rows}
+
+    result = {}
+    for username in usernames:
+        r = found.get(username)
+        result[username] = {
+            "username": username,
+            "isFollowing": bool(r and r.isFollowing),
+            "isFollowedBy": bool(r and r.isFollowedBy),
+            "followerCount": (r.followerCount or 0) if r else 0,
+            "followingCount": (r.followingCount or 0) if r else 0,
+        }
+    return result
 
 # ------------------------------
 # FOLLOW
@@ -31,9 +73,19 @@ def follow_user(body: FollowCreate, db: Session = Depends(get_db)):
         followedUsername=followed
     )
     db.add(follow)
+    follower_counts.bump(db, follower, followed, 1)
     db.commit()
     db.refresh(follow)
 
+    # separate transaction, see timeline.backfill_author
+    timeline.backfill_author(db, follower, followed)
+    db.commit()
+
+    counters.record_rows("follows")
+    follow_graph.add(follower, followed)
+    profile_cache.invalidate(follower)
+    profile_cache.invalidate(followed)
+
     return follow
 
 
@@ -55,8 +107,15 @@ def unfollow_user(body: FollowCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Relationship not found")
 
     db.delete(follow)
+    follower_counts.bump(db, follower, followed, -1)
+    timeline.remove_author(db, follower, followed)
     db.commit()
 
+    counters.record_rows("follows", -1)
+    follow_graph.remove(follower, followed)
+    profile_cache.invalidate(follower)
+    profile_cache.invalidate(followed)
+
     return follow
 
 
@@ -64,27 +123,44 @@ def unfollow_user(body: FollowCreate, db: Session = Depends(get_db)):
 # FOLLOWER COUNT
 # ------------------------------
 @router.get("/followerCount/{username}")
-def follower_count(username: str, db: Session = Depends(get_db)):
-    return db.query(models.Follow).filter(
-        models.Follow.followedUsername == username
-    ).count()
+def follower_count(username: str, db: Session = Depends(get_read_db)):
+    return follower_counts.follower_count(db, username)
 
 
 # ------------------------------
 # FOLLOWING COUNT
 # ------------------------------
 @router.get("/followingCount/{username}")
-def following_count(username: str, db: Session = Depends(get_db)):
-    return db.query(models.Follow).filter(
-        models.Follow.followerUsername == username
-    ).count()
+def following_count(username: str, db: Session = Depends(get_read_db)):
+    return follower_counts.following_count(db, username)
+
+
+# ------------------------------
+# RELATIONSHIPS WITH A LIST OF USERS
+# ------------------------------
+# one round trip for a whole search / follower list instead of
+# isFollowing + followerCount + followingCount per row
+@router.post("/batch", response_model=list[FollowRelationOut])
+def follow_batch(body: FollowBatchRequest, db: Session = Depends(get_read_db)):
+
+    usernames = list(dict.fromkeys(body.usernames))     # dedupe, keep order
+
+    if len(usernames) > FOLLOW_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {FOLLOW_BATCH_MAX} usernames per request")
+
+    if not usernames:
+        return []
+
+    found = relations(db, body.viewer, usernames)
+
+    return [found[u] for u in usernames]
 
 
 # ------------------------------
 # IS FOLLOWING?
 # ------------------------------
 @router.get("/isFollowing/{follower}/{followed}")
-def is_following(follower: str, followed: str, db: Session = Depends(get_db)):
+def is_following(follower: str, followed: str, db: Session = Depends(get_read_db)):
     follow = db.query(models.Follow).filter(
         models.Follow.followerUsername == follower,
         models.Follow.followedUsername == followed
@@ -97,10 +173,30 @@ def is_following(follower: str, followed: str, db: Session = Depends(get_db)):
 # LIST USERS I AM FOLLOWING
 # ------------------------------
 @router.get("/following/{username}")
-def get_following_users(username: str, db: Session = Depends(get_db)):
+def get_following_users(username: str, db: Session = Depends(get_read_db)):
 
     results = db.query(models.Follow).filter(
         models.Follow.followerUsername == username
     ).all()
 
     return [f.followedUsername for f in results]
+
+
+# ------------------------------
+# MUTUALS ("followed by ..." on a profile)
+# ------------------------------
+# accounts viewer follows that also follow username, from the in-memory graph
+@router.get("/mutuals/{viewer}/{username}")
+def get_mutuals(viewer: str, username: str, limit: Optional[int] = Query(None, ge=1)):
+    return follow_graph.mutuals(viewer, username, limit)
+
+
+# ------------------------------
+# SUGGESTIONS (people you may know)
+# ------------------------------
+@router.get("/suggestions/{username}")
+def get_suggestions(
+    username: str,
+    limit: int = Query(follow_graph.SUGGESTIONS_LIMIT, ge=1, le=follow_graph.SUGGESTIONS_MAX_LIMIT)
+):
+    return follow_graph.suggestions(username, limit)
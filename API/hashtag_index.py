@@ -0,0 +1,52 @@
+import time
+from typing import Optional
+
+from sqlalchemy import Table, func, select, tuple_, update
+from sqlalchemy.orm import Session
+
+# Parts of the hashtag index shared by the API (hashtags.py) and the
+# BackOffice (BackOffice/hashtags.py), which deletes posts and shows trending
+# tags from its own models. Nothing here imports the API's models or
+# database, the callers pass their post_hashtags / hashtag_buckets tables.
+#
+# Posts are counted in the hour the server indexed them (post_hashtags.bucket),
+# not by the timestamp the client sent: a client with a skewed clock could
+# otherwise put tags into future buckets and keep them trending.
+
+BUCKET_MS = 3600 * 1000
+
+
+def bucket_of(timestamp_ms: Optional[int] = None) -> int:
+    # hours since epoch; now when no time is given
+    return (timestamp_ms or int(time.time() * 1000)) // BUCKET_MS
+
+
+def unindex_post(db: Session, post_hashtags: Table, hashtag_buckets: Table, post_id: int):
+    # same transaction as the post delete; each tag loses one post in the
+    # bucket it was counted in
+    counted = select(post_hashtags.c.bucket, post_hashtags.c.tag).where(
+        post_hashtags.c.postId == post_id
+    )
+
+    db.execute(
+        update(hashtag_buckets)
+        .where(tuple_(hashtag_buckets.c.bucket, hashtag_buckets.c.tag).in_(counted))
+        .values(count=hashtag_buckets.c.count - 1)
+    )
+    db.execute(post_hashtags.delete().where(post_hashtags.c.postId == post_id))
+
+
+def trending(db: Session, hashtag_buckets: Table, hours: int, limit: int, now_ms: Optional[int] = None) -> list[dict]:
+    start = bucket_of(now_ms) - hours + 1
+    total = func.sum(hashtag_buckets.c.count)
+
+    rows = db.execute(
+        select(hashtag_buckets.c.tag, total.label("count"))
+        .where(hashtag_buckets.c.bucket >= start)
+        .group_by(hashtag_buckets.c.tag)
+        .having(total > 0)
+        .order_by(total.desc(), hashtag_buckets.c.tag.asc())
+        .limit(limit)
+    ).all()
+
+    return [{"tag": f"#{r.tag}", "count": int(r.count)} for r in rows]
@@ -0,0 +1,110 @@
+import re
+import time
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from . import models, counters, hashtag_index
+from .feed import apply_cursor, page_posts
+from .hashtag_index import bucket_of
+
+# Hashtag index maintained on post create/delete: post_hashtags maps a tag to
+# its posts, hashtag_buckets keeps per-hour counts so trending tags over a
+# window are a small GROUP BY instead of a scan of every caption. Unindexing
+# and the trending query are in hashtag_index.py, shared with the BackOffice.
+
+TAG_MAX_LENGTH = 100
+REBUILD_CHUNK_SIZE = 1000
+
+TAG_RE = re.compile(r"#(\w+)")
+
+
+def extract_tags(caption: Optional[str]) -> set[str]:
+    return {t.lower()[:TAG_MAX_LENGTH] for t in TAG_RE.findall(caption or "")}
+
+
+def normalize_tag(tag: str) -> str:
+    return tag.lstrip("#").lower()[:TAG_MAX_LENGTH]
+
+
+# -------------------------
+# WRITE PATH
+# -------------------------
+
+def index_post(db: Session, post, received_ms: Optional[int] = None):
+    # the post must already be flushed so it has an id; it is counted in the
+    # hour it was received (now), the client's timestamp only orders the tag page
+    tags = extract_tags(post.caption)
+    if not tags:
+        return
+
+    bucket = bucket_of(received_ms)
+
+    db.add_all(
+        models.PostHashtag(tag=tag, postId=post.id, timestamp=post.timestamp, bucket=bucket)
+        for tag in tags
+    )
+
+    for tag in tags:
+        counters.upsert_add(
+            db, models.HashtagBucket.__table__, {"bucket": bucket, "tag": tag}, "count", 1
+        )
+
+
+def unindex_post(db: Session, post_id: int):
+    hashtag_index.unindex_post(
+        db, models.PostHashtag.__table__, models.HashtagBucket.__table__, post_id
+    )
+
+
+# -------------------------
+# READ PATH
+# -------------------------
+
+def read_tag(db: Session, tag: str, viewer: Optional[str], before: Optional[str], limit: int) -> dict:
+    query = db.query(models.Post).join(
+        models.PostHashtag,
+        models.PostHashtag.postId == models.Post.id
+    ).filter(
+        models.PostHashtag.tag == normalize_tag(tag)
+    )
+
+    posts = apply_cursor(
+        query, before, models.PostHashtag.timestamp, models.PostHashtag.postId
+    ).limit(limit + 1).all()
+
+    return page_posts(db, posts, viewer, limit)
+
+
+def trending(db: Session, hours: int = 24, limit: int = 10, now_ms: Optional[int] = None) -> list[dict]:
+    return hashtag_index.trending(db, models.HashtagBucket.__table__, hours, limit, now_ms)
+
+
+def rebuild(db: Session, chunk_size: int = REBUILD_CHUNK_SIZE) -> int:
+    db.query(models.PostHashtag).delete(synchronize_session=False)
+    db.query(models.HashtagBucket).delete(synchronize_session=False)
+    db.commit()
+
+    # the receive time is gone, the post's own timestamp is the best guess
+    # (never later than now)
+    now_ms = int(time.time() * 1000)
+
+    indexed = 0
+    last_id = 0
+
+    while True:
+        posts = db.query(
+            models.Post.id, models.Post.caption, models.Post.timestamp
+        ).filter(
+            models.Post.id > last_id
+        ).order_by(models.Post.id.asc()).limit(chunk_size).all()
+
+        if not posts:
+            return indexed
+
+        for p in posts:
+            index_post(db, p, min(p.timestamp or now_ms, now_ms))
+        db.commit()
+
+        indexed += len(posts)
+        last_id = posts[-1].id
@@ -0,0 +1,227 @@
+import asyncio
+import functools
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Request
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Per-request database instrumentation: SQLAlchemy engine events count the
+# statements, DB time and rows of whatever request is running (tracked with
+# a ContextVar, so it follows the request into the threadpool and into
+# run_sync). The middleware in main.py aggregates it per route for /metrics
+# and, with API_DEBUG=1, returns it in X-* response headers.
+
+DEBUG = os.getenv("API_DEBUG", "0") == "1"
+
+# the same statement this many times in one request is an N+1 suspect
+N_PLUS_ONE_THRESHOLD = 5
+SUSPECTS_KEPT = 5           # statements kept per route in /metrics
+STATEMENT_PREVIEW = 300     # characters
+
+
+class RequestStats:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.statements = {}            # SQL text -> executions
+        self.endpoint_done = None       # perf_counter when the endpoint returned
+        self.serialization_time = 0.0
+        self.total_time = 0.0
+
+    def n_plus_one(self) -> dict:
+        return {
+            sql: count for sql, count in self.statements.items()
+            if count >= N_PLUS_ONE_THRESHOLD
+        }
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+_lock = threading.Lock()
+_routes = {}                # "GET /posts/{username}" -> aggregate dict
+
+
+# -------------------------
+# SQLALCHEMY EVENTS
+# -------------------------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+
+    started = conn.info["query_started"].pop()
+    stats.queries += 1
+    stats.db_time += time.perf_counter() - started
+    stats.statements[statement] = stats.statements.get(statement, 0) + 1
+
+    # rows changed by INSERT / UPDATE / DELETE; SELECTs are counted as loaded objects
+    if not context.isddl and cursor.description is None and cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+
+
+def _on_load(target, context):
+    stats = _current.get()
+    if stats is not None:
+        stats.rows += 1
+
+
+def install(base):
+    # every engine (sync, read, async) and every model of the declarative base
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(base, "load", _on_load, propagate=True)
+
+
+# -------------------------
+# REQUEST SCOPE
+# -------------------------
+
+def begin() -> tuple:
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end(stats: RequestStats, token):
+    stats.total_time = time.perf_counter() - stats.started
+    _current.reset(token)
+
+
+def _mark_endpoint_done():
+    stats = _current.get()
+    if stats is not None:
+        stats.endpoint_done = time.perf_counter()
+
+
+def _timed_endpoint(endpoint):
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _mark_endpoint_done()
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                _mark_endpoint_done()
+
+    return wrapper
+
+
+class InstrumentedRoute(APIRoute):
+    # splits endpoint time from response serialization (response_model + JSON)
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request):
+            response = await handler(request)
+
+            stats = _current.get()
+            if stats is not None and stats.endpoint_done is not None:
+                stats.serialization_time = time.perf_counter() - stats.endpoint_done
+
+            return response
+
+        return timed_handler
+
+
+# -------------------------
+# AGGREGATION
+# -------------------------
+
+def record(route: str, stats: RequestStats):
+    suspects = stats.n_plus_one()
+
+    with _lock:
+        agg = _routes.get(route)
+        if agg is None:
+            agg = _routes[route] = {
+                "requests": 0,
+                "queries": 0,
+                "maxQueries": 0,
+                "dbTime": 0.0,
+                "rows": 0,
+                "serializationTime": 0.0,
+                "totalTime": 0.0,
+                "nPlusOneRequests": 0,
+                "nPlusOneStatements": {},
+            }
+
+        agg["requests"] += 1
+        agg["queries"] += stats.queries
+        agg["maxQueries"] = max(agg["maxQueries"], stats.queries)
+        agg["dbTime"] += stats.db_time
+        agg["rows"] += stats.rows
+        agg["serializationTime"] += stats.serialization_time
+        agg["totalTime"] += stats.total_time
+
+        if suspects:
+            agg["nPlusOneRequests"] += 1
+            kept = agg["nPlusOneStatements"]
+            for sql, count in suspects.items():
+                if sql in kept or len(kept) < SUSPECTS_KEPT:
+                    kept[sql] = max(kept.get(sql, 0), count)
+
+
+def snapshot() -> dict:
+    with _lock:
+        routes = {route: dict(agg, nPlusOneStatements=dict(agg["nPlusOneStatements"])) for route, agg in _routes.items()}
+
+    result = {}
+    for route, agg in sorted(routes.items(), key=lambda item: -item[1]["dbTime"]):
+        n = agg["requests"]
+        result[route] = {
+            "requests": n,
+            "avgQueries": round(agg["queries"] / n, 2),
+            "maxQueries": agg["maxQueries"],
+            "avgDbMs": round(agg["dbTime"] / n * 1000, 2),
+            "totalDbMs": round(agg["dbTime"] * 1000, 2),
+            "avgRows": round(agg["rows"] / n, 2),
+            "avgSerializationMs": round(agg["serializationTime"] / n * 1000, 2),
+            "avgTotalMs": round(agg["totalTime"] / n * 1000, 2),
+            "nPlusOneRequests": agg["nPlusOneRequests"],
+            "nPlusOneStatements": [
+                {"statement": sql[:STATEMENT_PREVIEW], "executions": count}
+                for sql, count in sorted(agg["nPlusOneStatements"].items(), key=lambda item: -item[1])
+            ],
+        }
+
+    return result
+
+
+def reset():
+    with _lock:
+        _routes.clear()
+
+
+def debug_headers(stats: RequestStats) -> dict:
+    return {
+        "X-DB-Queries": str(stats.queries),
+        "X-DB-Time-Ms": f"{stats.db_time * 1000:.2f}",
+        "X-DB-Rows": str(stats.rows),
+        "X-Serialization-Ms": f"{stats.serialization_time * 1000:.2f}",
+        "X-Response-Time-Ms": f"{stats.total_time * 1000:.2f}",
+        "X-N-Plus-One": str(sum(1 for _ in stats.n_plus_one())),
+    }
@@ -1,22 +1,50 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from .. import models
-from ..database import get_db
+from .. import models, counters, user_cache
+from ..database import get_async_db
+from ..instrumentation import InstrumentedRoute
 
 router = APIRouter(
     prefix="/likes",
-    tags=["Likes"]
+    tags=["Likes"],
+    route_class=InstrumentedRoute
 )
 
 
+def current_like_count(db: Session, post_id: int) -> Optional[int]:
+    # stored count plus deltas not flushed yet (this transaction's included);
+    # None if the post does not exist
+    row = db.query(
+        models.Post.likeCount,
+        counters.pending_sum(models.CounterDelta.likeCount, post_id).label("pending")
+    ).filter(models.Post.id == post_id).first()
+    if row is None:
+        return None
+
+    return (row.likeCount or 0) + (row.pending or 0)
+
+
+# the routes are async, the work runs on the async session's connection
+# through run_sync so no threadpool slot is held while MySQL answers
 @router.post("/{postId}/{username}")
-def like_post(postId: int, username: str, db: Session = Depends(get_db)):
+async def like_post(postId: int, username: str, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(like, postId, username)
+
+
+@router.delete("/{postId}/{username}")
+async def unlike_post(postId: int, username: str, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(unlike, postId, username)
+
+
+def like(db: Session, postId: int, username: str) -> dict:
 
     # 🔍 Check user
-    user = db.query(models.User).filter(
-        models.User.username == username
-    ).first()
+    user = user_cache.get_user_state(db, username)
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -28,59 +56,49 @@ def like_post(postId: int, username: str, db: Session = Depends(get_db)):
             detail="Banned users cannot like posts"
         )
 
-    existing = db.query(models.PostLike).filter(
-        models.PostLike.postId == postId,
-        models.PostLike.username == username
-    ).first()
+    # one statement, a repeated tap is a no-op thanks to uq_post_likes_post_user
+    inserted = db.execute(
+        insert(models.PostLike)
+        .values(postId=postId, username=username)
+        .prefix_with("IGNORE", dialect="mysql")
+        .prefix_with("OR IGNORE", dialect="sqlite")
+    ).rowcount
+
+    # 🔢 likeCount is folded into posts by the counter flusher
+    if inserted:
+        counters.record(db, postId, likes=1)
+
+    like_count = current_like_count(db, postId)
+    if like_count is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Post not found")
 
-    if existing:
-        raise HTTPException(status_code=400, detail="Already liked")
+    db.commit()
 
-    new_like = models.PostLike(postId=postId, username=username)
-    db.add(new_like)
+    if inserted:
+        counters.record_rows("post_likes")
 
-    # 🔍 Update like count safely
-    post = db.query(models.Post).filter(models.Post.id == postId).first()
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
+    return {"message": "Post liked", "liked": True, "likeCount": like_count}
 
-    post.likeCount += 1
 
-    db.commit()
-    return {"message": "Post liked"}
+def unlike(db: Session, postId: int, username: str) -> dict:
 
-@router.delete("/{postId}/{username}")
-def unlike_post(postId: int, username: str, db: Session = Depends(get_db)):
-    existing = db.query(models.PostLike).filter(
+    deleted = db.query(models.PostLike).filter(
         models.PostLike.postId == postId,
         models.PostLike.username == username
-    ).first()
+    ).delete(synchronize_session=False)
 
-    if not existing:
-        raise HTTPException(status_code=400, detail="Not liked yet")
+    if deleted:
+        counters.record(db, postId, likes=-deleted)
 
-    db.delete(existing)
-
-    # Update like count
-    post = db.query(models.Post).filter(models.Post.id == postId).first()
-    post.likeCount -= 1
-    if post.likeCount < 0:
-        post.likeCount = 0
+    like_count = current_like_count(db, postId)
+    if like_count is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Post not found")
 
     db.commit()
-    return {"message": "Post unliked"}
-
-    existing = (
-        db.query(models.PostLike)
-        .filter(models.PostLike.postId == postId,
-                models.PostLike.username == username)
-        .first()
-    )
 
-    if not existing:
-        raise HTTPException(status_code=400, detail="Not liked yet")
-
-    db.delete(existing)
-    db.commit()
+    if deleted:
+        counters.record_rows("post_likes", -deleted)
 
-    return {"message": "Post unliked"}
+    return {"message": "Post unliked", "liked": False, "likeCount": max(like_count, 0)}
@@ -1,13 +1,31 @@
-from fastapi import FastAPI
-from .database import Base, engine
-from .routers import users, posts, comments, likes, follows, chat, notifications, auth
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from . import counters, follow_graph, instrumentation, slow_queries
+from .database import Base, SessionLocal, engine, pool_status
+from .realtime import hub
+from .routers import users, posts, comments, likes, follows, chat, notifications, auth, explore, profiles
 
 
 
 
 Base.metadata.create_all(bind=engine)
+instrumentation.install(Base)
+slow_queries.install(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # background flush of like/comment counters
+    counters.start(SessionLocal)
+    # follow graph in memory (mutuals, suggestions)
+    follow_graph.start(SessionLocal)
+    yield
+    follow_graph.stop()
+    counters.stop(SessionLocal)
 
-app = FastAPI(title="Social Network API")
+
+app = FastAPI(title="Social Network API", lifespan=lifespan)
 
 app.include_router(users.router)
 app.include_router(posts.router)
@@ -17,6 +35,26 @@ app.include_router(follows.router)
 app.include_router(chat.router)
 app.include_router(notifications.router)
 app.include_router(auth.router)
+app.include_router(explore.router)
+app.include_router(profiles.router)
+
+
+# 📊 query count / DB time / rows / serialization time per request
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    stats, token = instrumentation.begin()
+    try:
+        response = await call_next(request)
+    finally:
+        instrumentation.end(stats, token)
+
+    route = request.scope.get("route")
+    instrumentation.record(f"{request.method} {route.path if route else 'unmatched'}", stats)
+
+    if instrumentation.DEBUG:
+        response.headers.update(instrumentation.debug_headers(stats))
+
+    return response
 
 
 
@@ -27,3 +65,36 @@ def root():
     
     
     return {"message": "Social Network API is running!"}
+
+
+# per-route query stats and N+1 suspects of this worker
+@app.get("/metrics")
+def metrics():
+    return instrumentation.snapshot()
+
+
+# slow statements of this worker with EXPLAIN plans and index advice
+@app.get("/metrics/slow-queries")
+def slow_query_report():
+    return slow_queries.report(Base.metadata)
+
+
+# connection pool usage of this worker (write engine, read engine if separate)
+@app.get("/metrics/pool")
+def pool_metrics():
+    return pool_status()
+
+
+# Live chat events (new messages, reactions, read receipts).
+# The client only listens; it can send anything as a keep-alive ping.
+@app.websocket("/ws/chat/{username}")
+async def chat_socket(websocket: WebSocket, username: str):
+    await hub.connect(username, websocket)
+
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        hub.disconnect(username, websocket)
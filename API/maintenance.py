@@ -0,0 +1,23 @@
+from . import counters, follower_counts, hashtags, post_search, user_cache
+from .database import SessionLocal
+from .conversations import backfill_conversation_keys, rebuild_summaries
+
+# backfill and repair jobs, run this module with `python -m` from the project root
+
+
+def run_all():
+    db = SessionLocal()
+    try:
+        print("conversation keys backfilled:", backfill_conversation_keys(db))
+        print("conversation summaries rebuilt:", rebuild_summaries(db))
+        print("post counters fixed:", counters.reconcile(db))
+        print("follower counters fixed:", follower_counts.reconcile(db))
+        print("cache invalidations pruned:", user_cache.prune_invalidations(db))
+        print("posts indexed for search:", post_search.rebuild(db))
+        print("posts indexed by hashtag:", hashtags.rebuild(db))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_all()
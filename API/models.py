@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, BigInteger
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, BigInteger, Double, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -19,6 +19,8 @@ class User(Base):
     profileImageResId = Column(Integer, nullable=True)
     role = Column(String(20), default="user")          # if not already
     is_banned = Column(Boolean, default=False)     
+    followerCount = Column(Integer, default=0)      # kept by follower_counts.py
+    followingCount = Column(Integer, default=0)
     posts = relationship("Post", back_populates="user")
     
 
@@ -40,6 +42,11 @@ class Post(Base):
     commentCount = Column(Integer, default=0)  # ✅ NEW
     user = relationship("User", back_populates="posts")
 
+    # feed pages are read newest-first with a (timestamp, id) cursor
+    __table_args__ = (
+        Index("ix_posts_timestamp_id", "timestamp", "id"),
+    )
+
 # -------------------------
 # POST LIKES TABLE
 # -------------------------
@@ -50,6 +57,82 @@ class PostLike(Base):
     postId = Column(Integer, ForeignKey("posts.id"), nullable=False)
     username = Column(String(50), ForeignKey("users.username"), nullable=False)
 
+    # one like per user per post; also serves the (postId, username) lookups
+    __table_args__ = (
+        UniqueConstraint("postId", "username", name="uq_post_likes_post_user"),
+    )
+
+# -------------------------
+# POST SEARCH TERMS TABLE (inverted index over captions)
+# -------------------------
+class PostTerm(Base):
+    __tablename__ = "post_terms"
+
+    term = Column(String(100), primary_key=True)
+    postId = Column(Integer, ForeignKey("posts.id"), primary_key=True, index=True)
+    weight = Column(Integer, default=1)
+
+# -------------------------
+# POST COUNTER DELTAS (drained into posts by counters.flush)
+# -------------------------
+class CounterDelta(Base):
+    __tablename__ = "counter_deltas"
+
+    id = Column(Integer, primary_key=True)
+    postId = Column(Integer, nullable=False, index=True)    # no FK, the post may go before the flush
+    likeCount = Column(Integer, default=0)
+    commentCount = Column(Integer, default=0)
+
+# -------------------------
+# TABLE STATS (row count rollup for the BackOffice dashboard)
+# -------------------------
+class TableStat(Base):
+    __tablename__ = "table_stats"
+
+    name = Column(String(50), primary_key=True)
+    rowCount = Column(BigInteger, default=0)
+    refreshedAt = Column(BigInteger)    # ms, last full recount (deltas don't move it)
+
+
+# -------------------------
+# TRENDING POSTS (time-decayed scores, see trending.py)
+# -------------------------
+class TrendingScore(Base):
+    __tablename__ = "trending_scores"
+
+    postId = Column(Integer, ForeignKey("posts.id"), primary_key=True)
+    era = Column(Integer, default=0)
+    score = Column(Double, default=0)     # decayed scores reach ~2^30 before a rebase, FLOAT would tie them
+
+    __table_args__ = (
+        Index("ix_trending_scores_era_score", "era", "score"),
+    )
+
+
+# -------------------------
+# HASHTAG TABLES
+# -------------------------
+class PostHashtag(Base):
+    __tablename__ = "post_hashtags"
+
+    tag = Column(String(100), primary_key=True)     # lowercase, without "#"
+    postId = Column(Integer, ForeignKey("posts.id"), primary_key=True, index=True)
+    timestamp = Column(BigInteger)                  # the post's, orders the tag page
+    bucket = Column(Integer)                        # hashtag_buckets hour it was counted in (server time)
+
+    # newest posts for a tag, (timestamp, postId) cursor
+    __table_args__ = (
+        Index("ix_post_hashtags_tag_timestamp", "tag", "timestamp", "postId"),
+    )
+
+
+class HashtagBucket(Base):
+    __tablename__ = "hashtag_buckets"
+
+    bucket = Column(Integer, primary_key=True)      # hours since epoch
+    tag = Column(String(100), primary_key=True)
+    count = Column(Integer, default=0)
+
 # -------------------------
 # COMMENTS TABLE
 # -------------------------
@@ -70,7 +153,24 @@ class Follow(Base):
     __tablename__ = "follows"
 
     followerUsername = Column(String(50), ForeignKey("users.username"), primary_key=True)
-    followedUsername = Column(String(50), ForeignKey("users.username"), primary_key=True)
+    followedUsername = Column(String(50), ForeignKey("users.username"), primary_key=True, index=True)
+
+
+# -------------------------
+# HOME TIMELINE TABLE
+# -------------------------
+class TimelineEntry(Base):
+    __tablename__ = "timelines"
+
+    ownerUsername = Column(String(50), ForeignKey("users.username"), primary_key=True)
+    postId = Column(Integer, ForeignKey("posts.id"), primary_key=True, index=True)
+    authorUsername = Column(String(50), nullable=False)
+    timestamp = Column(BigInteger)
+
+    # a home feed page is one range scan on (owner, timestamp, postId)
+    __table_args__ = (
+        Index("ix_timelines_owner_timestamp", "ownerUsername", "timestamp", "postId"),
+    )
 
 
 # -------------------------
@@ -87,8 +187,44 @@ class ChatMessage(Base):
     isVoice = Column(Boolean, default=False)
     emoji = Column(String(10), nullable=True)
     isRead = Column(Boolean, default=False)
+    conversationKey = Column(String(101), nullable=True)  # "<user>|<user>", ordered pair
 
-    
+    # a conversation page is one range scan on (conversationKey, id)
+    __table_args__ = (
+        Index("ix_messages_conversation_id", "conversationKey", "id"),
+    )
+
+
+# -------------------------
+# CONVERSATION SUMMARIES TABLE (chat inbox)
+# -------------------------
+class ConversationSummary(Base):
+    __tablename__ = "conversation_summaries"
+
+    ownerUsername = Column(String(50), ForeignKey("users.username"), primary_key=True)
+    partnerUsername = Column(String(50), ForeignKey("users.username"), primary_key=True)
+    lastMessageId = Column(Integer, nullable=True)
+    lastSender = Column(String(50), nullable=True)
+    lastMessage = Column(String(100), default="")   # preview only
+    lastTimestamp = Column(BigInteger)
+    lastIsVoice = Column(Boolean, default=False)
+    lastEmoji = Column(String(10), nullable=True)
+    unreadCount = Column(Integer, default=0)
+
+    # inbox is read newest-first per owner
+    __table_args__ = (
+        Index("ix_conversation_summaries_owner_recent", "ownerUsername", "lastTimestamp", "lastMessageId"),
+    )
+
+
+# -------------------------
+# CHAT UNREAD BADGE TABLE
+# -------------------------
+class ChatUnreadTotal(Base):
+    __tablename__ = "chat_unread_totals"
+
+    username = Column(String(50), ForeignKey("users.username"), primary_key=True)
+    unreadCount = Column(Integer, default=0)
 
 
 # -------------------------
@@ -97,7 +233,8 @@ class ChatMessage(Base):
 class Notification(Base):
     __tablename__ = "notifications"
 
-    id = Column(String(100), primary_key=True)  # UUID as string
+    seq = Column(Integer, primary_key=True)     # server insert order, the stream cursor
+    id = Column(String(100), unique=True, nullable=False)  # UUID as string
     username = Column(String(50), ForeignKey("users.username"), nullable=False)
     message = Column(String(255), nullable=False)
     timestamp = Column(BigInteger)
@@ -105,6 +242,13 @@ class Notification(Base):
     type = Column(String(50), nullable=False)
     targetUsername = Column(String(50), ForeignKey("users.username"), index=True)
 
+    # newest-first list, and "newer than watermark" reads for one user
+    # (seq, not the client-supplied timestamp, which can repeat or go back)
+    __table_args__ = (
+        Index("ix_notifications_target_timestamp", "targetUsername", "timestamp"),
+        Index("ix_notifications_target_seq", "targetUsername", "seq"),
+    )
+
 
 class ChatRequest(Base):
     __tablename__ = "chat_requests"
@@ -114,3 +258,16 @@ class ChatRequest(Base):
     receiver = Column(String(50), ForeignKey("users.username"), nullable=False)
     accepted = Column(Boolean, default=False)
     timestamp = Column(BigInteger)
+
+
+# -------------------------
+# CACHE INVALIDATIONS TABLE
+# -------------------------
+# written by the API and the BackOffice whenever a user changes,
+# read by every API worker to drop stale user cache entries
+class CacheInvalidation(Base):
+    __tablename__ = "cache_invalidations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    username = Column(String(50), nullable=True)   # NULL = drop everything
+    timestamp = Column(BigInteger)
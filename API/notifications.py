@@ -1,14 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from .. import models, schemas
-from ..database import get_db
+from .. import models, schemas, counters, serialization
+from ..database import AsyncSessionLocal, get_async_read_db, get_db
+from ..realtime import bus
+from ..instrumentation import InstrumentedRoute
 
 router = APIRouter(
     prefix="/notifications",
-    tags=["Notifications"]
+    tags=["Notifications"],
+    route_class=InstrumentedRoute
 )
 
+STREAM_BATCH_SIZE = 100
+STREAM_KEEPALIVE_SECONDS = 15
+LONG_POLL_MAX_SECONDS = 60
+
+
+async def notifications_since(username: str, since: int) -> list[dict]:
+    # since is a seq: server-assigned, so equal or out-of-order client
+    # timestamps can't make the stream skip a notification
+    # short-lived session: waiting clients must not hold a pooled connection
+    async with AsyncSessionLocal() as db:
+        notifs = (await db.scalars(
+            select(models.Notification).where(
+                models.Notification.targetUsername == username,
+                models.Notification.seq > since
+            ).order_by(models.Notification.seq.asc()).limit(STREAM_BATCH_SIZE)
+        )).all()
+
+        return [schemas.NotificationOut.model_validate(n, from_attributes=True).model_dump() for n in notifs]
+
 # CREATE NOTIFICATION
 @router.post("/", response_model=schemas.NotificationOut)
 def create_notification(notification: schemas.NotificationCreate, db: Session = Depends(get_db)):
@@ -27,20 +55,93 @@ def create_notification(notification: schemas.NotificationCreate, db: Session =
     db.commit()
     db.refresh(new_notif)
 
+    counters.record_rows("notifications")
+
+    # 🔔 wake any stream / long-poll waiting on this user
+    bus.notify(new_notif.targetUsername)
+
     return new_notif
 
 
 # GET ALL NOTIFICATIONS FOR A USER
 @router.get("/{username}", response_model=list[schemas.NotificationOut])
-def get_notifications(username: str, db: Session = Depends(get_db)):
+async def get_notifications(username: str, db: AsyncSession = Depends(get_async_read_db)):
+
+    if serialization.enabled("notifications"):
+        rows = (await db.execute(
+            select(*serialization.NOTIFICATION_COLUMNS).where(
+                models.Notification.targetUsername == username
+            ).order_by(models.Notification.timestamp.desc())
+        )).all()
+
+        return serialization.FastJSONResponse(
+            serialization.rows_to_dicts(rows, serialization.NOTIFICATION_COLUMNS)
+        )
 
-    notifs = db.query(models.Notification).filter(
-        models.Notification.targetUsername == username
-    ).order_by(models.Notification.timestamp.desc()).all()
+    notifs = (await db.scalars(
+        select(models.Notification).where(
+            models.Notification.targetUsername == username
+        ).order_by(models.Notification.timestamp.desc())
+    )).all()
 
     return notifs
 
 
+# STREAM NEW NOTIFICATIONS (Server-Sent Events)
+# since / Last-Event-ID: seq of the newest notification the client has
+@router.get("/{username}/stream")
+async def stream_notifications(
+    username: str,
+    since: int = 0,
+    last_event_id: Optional[str] = Header(None),
+):
+    if last_event_id and last_event_id.isdigit():
+        since = max(since, int(last_event_id))
+
+    async def events():
+        watermark = since
+        event = bus.register(username)
+
+        try:
+            while True:
+                notifs = await notifications_since(username, watermark)
+
+                for n in notifs:
+                    watermark = max(watermark, n["seq"])
+                    yield f"id: {n['seq']}\nevent: notification\ndata: {json.dumps(n)}\n\n"
+
+                if len(notifs) == STREAM_BATCH_SIZE:
+                    continue
+
+                if not await bus.wait(event, STREAM_KEEPALIVE_SECONDS):
+                    yield ": keep-alive\n\n"
+        finally:
+            bus.unregister(username, event)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# LONG-POLL FOR NEW NOTIFICATIONS (fallback when SSE is not available)
+# since: seq of the newest notification the client has
+@router.get("/{username}/poll", response_model=list[schemas.NotificationOut])
+async def poll_notifications(
+    username: str,
+    since: int = 0,
+    timeout: float = Query(25, ge=0, le=LONG_POLL_MAX_SECONDS)
+):
+    event = bus.register(username)
+
+    try:
+        notifs = await notifications_since(username, since)
+
+        if not notifs and timeout and await bus.wait(event, timeout):
+            notifs = await notifications_since(username, since)
+
+        return notifs
+    finally:
+        bus.unregister(username, event)
+
+
 # MARK NOTIFICATION AS SEEN
 @router.post("/seen/{notif_id}")
 def mark_as_seen(notif_id: str, db: Session = Depends(get_db)):
@@ -72,4 +173,6 @@ def delete_notification(notif_id: str, db: Session = Depends(get_db)):
     db.delete(notif)
     db.commit()
 
+    counters.record_rows("notifications", -1)
+
     return {"message": "Notification deleted"}
@@ -0,0 +1,81 @@
+import re
+
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Inverted index over post captions, kept in the post_terms table so the
+# BackOffice can search it without scanning posts. Keep the tokenizer in
+# sync with BackOffice/post_search.py.
+
+TERM_MAX_LENGTH = 100
+HASHTAG_WEIGHT = 3
+REBUILD_CHUNK_SIZE = 1000
+
+TOKEN_RE = re.compile(r"#?\w+")
+
+
+def tokenize(text: str) -> dict:
+    # term -> weight; "#tag" also indexes "tag" so plain words find hashtags
+    weights = {}
+
+    for token in TOKEN_RE.findall((text or "").lower()):
+        if token.startswith("#"):
+            terms = [(token, HASHTAG_WEIGHT), (token[1:], 1)]
+        else:
+            terms = [(token, 1)]
+
+        for term, weight in terms:
+            if len(term) < 2:
+                continue
+            term = term[:TERM_MAX_LENGTH]
+            weights[term] = weights.get(term, 0) + weight
+
+    return weights
+
+
+def post_terms(post) -> dict:
+    weights = tokenize(post.caption)
+    # the author is searchable too, as "@username"
+    author = f"@{post.username.lower()}"[:TERM_MAX_LENGTH]
+    weights[author] = weights.get(author, 0) + 1
+    return weights
+
+
+def index_post(db: Session, post: models.Post):
+    # the post must already be flushed so it has an id
+    db.add_all(
+        models.PostTerm(term=term, postId=post.id, weight=weight)
+        for term, weight in post_terms(post).items()
+    )
+
+
+def unindex_post(db: Session, post_id: int):
+    db.query(models.PostTerm).filter(
+        models.PostTerm.postId == post_id
+    ).delete(synchronize_session=False)
+
+
+def rebuild(db: Session, chunk_size: int = REBUILD_CHUNK_SIZE) -> int:
+    db.query(models.PostTerm).delete(synchronize_session=False)
+    db.commit()
+
+    indexed = 0
+    last_id = 0
+
+    while True:
+        posts = db.query(
+            models.Post.id, models.Post.username, models.Post.caption
+        ).filter(
+            models.Post.id > last_id
+        ).order_by(models.Post.id.asc()).limit(chunk_size).all()
+
+        if not posts:
+            return indexed
+
+        for p in posts:
+            index_post(db, p)
+        db.commit()
+
+        indexed += len(posts)
+        last_id = posts[-1].id
@@ -1,12 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from .. import models, schemas
-from ..database import get_db
+from .. import models, schemas, counters, timeline, trending, user_cache, post_search, hashtags, serialization, profile_cache
+from ..database import get_async_read_db, get_db, get_read_db
+from ..feed import FEED_PAGE_SIZE, FEED_MAX_PAGE_SIZE, build_page, build_row_page, liked_post_ids
+from ..instrumentation import InstrumentedRoute
+
+TRENDING_WINDOW_HOURS = 24
+TRENDING_MAX_WINDOW_HOURS = 24 * 30
+TRENDING_TAGS = 10
+TRENDING_MAX_TAGS = 100
 
 router = APIRouter(
     prefix="/posts",
-    tags=["Posts"]
+    tags=["Posts"],
+    route_class=InstrumentedRoute
 )
 
 # CREATE POST
@@ -14,9 +25,7 @@ router = APIRouter(
 def create_post(post: schemas.PostCreate, db: Session = Depends(get_db)):
 
     # 🔍 Get user by username
-    user = db.query(models.User).filter(
-        models.User.username == post.username
-    ).first()
+    user = user_cache.get_user_state(db, post.username)
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -39,34 +48,104 @@ def create_post(post: schemas.PostCreate, db: Session = Depends(get_db)):
     )
 
     db.add(new_post)
+    db.flush()
+
+    # 📬 push into followers' home timelines
+    timeline.fan_out_post(db, new_post)
+    post_search.index_post(db, new_post)
+    hashtags.index_post(db, new_post)
+
     db.commit()
     db.refresh(new_post)
 
+    counters.record_rows("posts")
+    profile_cache.invalidate(new_post.username)
+
     return new_post
 
 # GET ALL POSTS (Feed)
 @router.get("/{username}", response_model=list[schemas.PostOut])
-def get_all_posts(username: str, db: Session = Depends(get_db)):
+def get_all_posts(username: str, db: Session = Depends(get_read_db)):
     posts = db.query(models.Post).order_by(models.Post.timestamp.desc()).all()
 
+    liked = liked_post_ids(db, username, [p.id for p in posts])
     for p in posts:
-        is_liked = db.query(models.PostLike).filter(
-            models.PostLike.postId == p.id,
-            models.PostLike.username == username
-        ).first()
-
-        p.isLiked = is_liked is not None
+        p.isLiked = p.id in liked
 
     return posts
 
 
+# GET FEED PAGE (cursor based)
+@router.get("/feed/{username}", response_model=schemas.PostPage)
+async def get_feed(
+    username: str,
+    before: Optional[str] = None,
+    limit: int = Query(FEED_PAGE_SIZE, ge=1, le=FEED_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    # ⚡ column rows straight to JSON bytes, response_model stays for the docs
+    if serialization.enabled("feed"):
+        page = await db.run_sync(
+            lambda session: build_row_page(
+                session, session.query(*serialization.POST_COLUMNS), username, before, limit
+            )
+        )
+        return serialization.FastJSONResponse(page)
+
+    return await db.run_sync(
+        lambda session: build_page(session, session.query(models.Post), username, before, limit)
+    )
+
+
+# GET POSTS BY HASHTAG (cursor based)
+@router.get("/tag/{tag}", response_model=schemas.PostPage)
+def get_posts_by_tag(
+    tag: str,
+    viewer: Optional[str] = None,
+    before: Optional[str] = None,
+    limit: int = Query(FEED_PAGE_SIZE, ge=1, le=FEED_MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db)
+):
+    return hashtags.read_tag(db, tag, viewer, before, limit)
+
+
+# GET TRENDING HASHTAGS (top K over the last few hours)
+@router.get("/tags/trending")
+def get_trending_tags(
+    hours: int = Query(TRENDING_WINDOW_HOURS, ge=1, le=TRENDING_MAX_WINDOW_HOURS),
+    limit: int = Query(TRENDING_TAGS, ge=1, le=TRENDING_MAX_TAGS),
+    db: Session = Depends(get_read_db)
+):
+    return hashtags.trending(db, hours, limit)
+
+
+# GET HOME TIMELINE (posts from people you follow)
+@router.get("/timeline/{username}", response_model=schemas.PostPage)
+async def get_timeline(
+    username: str,
+    before: Optional[str] = None,
+    limit: int = Query(FEED_PAGE_SIZE, ge=1, le=FEED_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    if serialization.enabled("timeline"):
+        page = await db.run_sync(timeline.read_timeline, username, before, limit, True)
+        return serialization.FastJSONResponse(page)
+
+    return await db.run_sync(timeline.read_timeline, username, before, limit)
+
+
 # GET POSTS FROM ONE USER
+# viewer: whose likes fill isLiked
 @router.get("/user/{username}", response_model=list[schemas.PostOut])
-def get_posts_by_user(username: str, db: Session = Depends(get_db)):
+def get_posts_by_user(username: str, viewer: Optional[str] = None, db: Session = Depends(get_read_db)):
     posts = db.query(models.Post).filter(
         models.Post.username == username
     ).order_by(models.Post.timestamp.desc()).all()
 
+    liked = liked_post_ids(db, viewer, [p.id for p in posts])
+    for p in posts:
+        p.isLiked = p.id in liked
+
     return posts
     
 
@@ -84,11 +163,21 @@ def delete_post(post_id: int, username: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=403, detail="Not allowed to delete this post")
 
     # ✅ delete children first (avoid FK error)
-    db.query(models.PostLike).filter(models.PostLike.postId == post_id).delete(synchronize_session=False)
-    db.query(models.Comment).filter(models.Comment.postId == post_id).delete(synchronize_session=False)
+    likes = db.query(models.PostLike).filter(models.PostLike.postId == post_id).delete(synchronize_session=False)
+    comments = db.query(models.Comment).filter(models.Comment.postId == post_id).delete(synchronize_session=False)
+    timeline.remove_post(db, post_id)
+    post_search.unindex_post(db, post_id)
+    hashtags.unindex_post(db, post_id)
+    trending.remove_post(db, post_id)
+    counters.drop_post(db, post_id)
 
     # ✅ now delete the post
     db.delete(post)
     db.commit()
 
+    counters.record_rows("posts", -1)
+    counters.record_rows("post_likes", -likes)
+    counters.record_rows("comments", -comments)
+    profile_cache.invalidate(username)
+
     return {"message": "Post deleted"}
\ No newline at end of file
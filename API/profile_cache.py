@@ -0,0 +1,174 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models, schemas, serialization, user_cache
+from .database import ReadSessionLocal
+from .feed import apply_cursor, liked_post_ids, split_page
+
+# The viewer-independent part of a profile (user fields, follower counts,
+# first page of posts) cached per username. An entry is fresh for
+# PROFILE_TTL_SECONDS; after that it is still served for up to
+# PROFILE_STALE_SECONDS while one background thread reloads it, so opening a
+# popular profile doesn't wait on MySQL. Posts and follows made on this
+# worker, and user_cache invalidations (profile edits, bans, sign-ups from
+# any worker or the BackOffice) drop entries. The viewer's part (follow
+# state, isLiked) is added per request from the database, so it agrees with
+# the counts whichever worker took the follow: two primary-key probes on
+# follows and one IN lookup on post_likes.
+
+PROFILE_TTL_SECONDS = 10
+PROFILE_STALE_SECONDS = 60
+PROFILE_POSTS_PAGE_SIZE = 12
+CACHE_MAX_ENTRIES = 10000
+
+_lock = threading.Lock()
+_entries = OrderedDict()    # username -> (fresh_until, stale_until, profile or None)
+_refreshing = set()         # usernames being reloaded in the background
+
+# bumped by invalidations, so a load that started before one can't store
+# what it read; per username, so writes to other profiles don't discard it
+_generation = 0             # invalidate(None)
+_versions = {}              # username -> counter
+
+logger = logging.getLogger(__name__)
+
+
+def _version_of(username: str) -> tuple[int, int]:
+    # call with _lock held
+    return _generation, _versions.get(username, 0)
+
+
+# -------------------------
+# LOADING
+# -------------------------
+
+def load(db: Session, username: str) -> Optional[dict]:
+    user = db.query(models.User).filter(models.User.username == username).first()
+    if not user:
+        return None
+
+    rows = apply_cursor(
+        db.query(*serialization.POST_COLUMNS).filter(models.Post.username == username), None
+    ).limit(PROFILE_POSTS_PAGE_SIZE + 1).all()
+    rows, next_cursor = split_page(rows, PROFILE_POSTS_PAGE_SIZE)
+
+    return {
+        "user": schemas.UserOut.model_validate(user).model_dump(),
+        "followerCount": user.followerCount or 0,
+        "followingCount": user.followingCount or 0,
+        "posts": {"items": serialization.post_dicts(rows, set()), "nextCursor": next_cursor},
+    }
+
+
+def _put(username: str, profile: Optional[dict], version: tuple[int, int]):
+    now = time.monotonic()
+    with _lock:
+        if version != _version_of(username):
+            return
+
+        _entries[username] = (now + PROFILE_TTL_SECONDS, now + PROFILE_STALE_SECONDS, profile)
+        _entries.move_to_end(username)
+
+        while len(_entries) > CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+
+
+def _refresh(username: str, version: tuple[int, int]):
+    db = ReadSessionLocal()
+    try:
+        _put(username, load(db, username), version)
+    except Exception:
+        logger.exception("profile refresh failed for %s", username)
+    finally:
+        db.close()
+        with _lock:
+            _refreshing.discard(username)
+
+
+def get(db: Session, username: str) -> Optional[dict]:
+    # None means the user does not exist (also cached)
+    user_cache.sync_invalidations(db)
+
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(username)
+        version = _version_of(username)
+
+        if entry is not None and now < entry[1]:
+            _entries.move_to_end(username)
+
+            # stale: serve it anyway, one thread per username reloads it
+            if now >= entry[0] and username not in _refreshing:
+                _refreshing.add(username)
+                threading.Thread(target=_refresh, args=(username, version), daemon=True).start()
+
+            return entry[2]
+
+    profile = load(db, username)
+    _put(username, profile, version)
+
+    return profile
+
+
+def relationship(db: Session, viewer: Optional[str], username: str) -> tuple[bool, bool]:
+    # (viewer follows username, username follows viewer), one query
+    if not viewer or viewer == username:
+        return False, False
+
+    is_following = select(models.Follow.followerUsername).where(
+        models.Follow.followerUsername == viewer,
+        models.Follow.followedUsername == username
+    ).exists()
+
+    is_followed_by = select(models.Follow.followerUsername).where(
+        models.Follow.followerUsername == username,
+        models.Follow.followedUsername == viewer
+    ).exists()
+
+    row = db.query(is_following.label("isFollowing"), is_followed_by.label("isFollowedBy")).one()
+
+    return bool(row.isFollowing), bool(row.isFollowedBy)
+
+
+def for_viewer(db: Session, profile: dict, viewer: Optional[str]) -> dict:
+    username = profile["user"]["username"]
+    items = [dict(p) for p in profile["posts"]["items"]]
+
+    liked = liked_post_ids(db, viewer, [p["id"] for p in items])
+    for p in items:
+        p["isLiked"] = p["id"] in liked
+
+    is_following, is_followed_by = relationship(db, viewer, username)
+
+    return {
+        **profile,
+        "isFollowing": is_following,
+        "isFollowedBy": is_followed_by,
+        "posts": {"items": items, "nextCursor": profile["posts"]["nextCursor"]},
+    }
+
+
+# -------------------------
+# INVALIDATION
+# -------------------------
+
+def invalidate(username: Optional[str] = None):
+    # this worker only; other workers wait out the TTL
+    global _generation
+    with _lock:
+        if username is None:
+            _generation += 1
+            _versions.clear()
+            _entries.clear()
+        else:
+            _versions[username] = _versions.get(username, 0) + 1
+            _entries.pop(username, None)
+
+
+user_cache.add_listener(invalidate)
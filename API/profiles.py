@@ -0,0 +1,43 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from .. import models, schemas, serialization, profile_cache
+from ..database import get_read_db
+from ..feed import FEED_PAGE_SIZE, FEED_MAX_PAGE_SIZE, build_row_page
+from ..instrumentation import InstrumentedRoute
+
+router = APIRouter(
+    prefix="/profiles",
+    tags=["Profiles"],
+    route_class=InstrumentedRoute
+)
+
+
+# WHOLE PROFILE SCREEN (user, counts, viewer relationship, first page of posts)
+# replaces /users/{username} + /posts/user/{username} + the follow count and
+# isFollowing calls
+@router.get("/{username}", response_model=schemas.ProfileOut)
+def get_profile(username: str, viewer: Optional[str] = None, db: Session = Depends(get_read_db)):
+
+    profile = profile_cache.get(db, username)
+
+    if profile is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    return profile_cache.for_viewer(db, profile, viewer)
+
+
+# MORE POSTS OF A PROFILE (cursor from posts.nextCursor)
+@router.get("/{username}/posts", response_model=schemas.PostPage)
+def get_profile_posts(
+    username: str,
+    viewer: Optional[str] = None,
+    before: Optional[str] = None,
+    limit: int = Query(FEED_PAGE_SIZE, ge=1, le=FEED_MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db)
+):
+    query = db.query(*serialization.POST_COLUMNS).filter(models.Post.username == username)
+
+    return build_row_page(db, query, viewer, before, limit)
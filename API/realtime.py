@@ -0,0 +1,181 @@
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+
+from fastapi import WebSocket
+
+
+# -------------------------
+# BROKER (transport between workers)
+# -------------------------
+
+class Broker(ABC):
+    # publish/subscribe transport shared by every API worker;
+    # swap LocalBroker for a networked one to fan events out across processes
+
+    @abstractmethod
+    def publish(self, channel: str, payload: dict):
+        ...
+
+    @abstractmethod
+    def subscribe(self, callback):
+        ...
+
+
+class LocalBroker(Broker):
+    # in-process stand-in: single worker, tests, local development
+
+    def __init__(self):
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, payload: dict):
+        with self._lock:
+            callbacks = list(self._callbacks)
+
+        for callback in callbacks:
+            callback(channel, payload)
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._callbacks.append(callback)
+
+
+# -------------------------
+# CHAT HUB (connected sockets of this worker)
+# -------------------------
+
+class ChatHub:
+
+    def __init__(self, broker: Broker):
+        self._sockets = {}      # username -> set of WebSocket
+        self._lock = threading.Lock()
+        self._loop = None
+        self.attach(broker)
+
+    def attach(self, broker: Broker):
+        self.broker = broker
+        broker.subscribe(self._deliver)
+
+    async def connect(self, username: str, websocket: WebSocket):
+        await websocket.accept()
+        self._loop = asyncio.get_running_loop()
+
+        with self._lock:
+            self._sockets.setdefault(username, set()).add(websocket)
+
+    def disconnect(self, username: str, websocket: WebSocket):
+        with self._lock:
+            sockets = self._sockets.get(username)
+            if sockets is None:
+                return
+
+            sockets.discard(websocket)
+            if not sockets:
+                del self._sockets[username]
+
+    def is_online(self, username: str) -> bool:
+        with self._lock:
+            return username in self._sockets
+
+    def publish(self, usernames, event: dict):
+        # safe to call from the sync routes' worker threads
+        for username in set(usernames):
+            self.broker.publish(f"user:{username}", event)
+
+    def _deliver(self, channel: str, payload: dict):
+        if not channel.startswith("user:"):
+            return
+
+        username = channel.split(":", 1)[1]
+
+        with self._lock:
+            sockets = list(self._sockets.get(username, ()))
+
+        if not sockets or self._loop is None:
+            return
+
+        for websocket in sockets:
+            asyncio.run_coroutine_threadsafe(
+                self._send(username, websocket, payload),
+                self._loop
+            )
+
+    async def _send(self, username: str, websocket: WebSocket, payload: dict):
+        try:
+            await websocket.send_json(payload)
+        except Exception:
+            self.disconnect(username, websocket)
+
+
+# -------------------------
+# EVENT BUS (wake-ups for long-poll / SSE waiters)
+# -------------------------
+
+class EventBus:
+
+    def __init__(self, broker: Broker):
+        self._waiters = {}      # key -> set of (loop, asyncio.Event)
+        self._lock = threading.Lock()
+        self.attach(broker)
+
+    def attach(self, broker: Broker):
+        self.broker = broker
+        broker.subscribe(self._wake)
+
+    def register(self, key: str) -> asyncio.Event:
+        # register before reading the database so no wake-up is missed
+        event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            self._waiters.setdefault(key, set()).add((loop, event))
+
+        return event
+
+    def unregister(self, key: str, event: asyncio.Event):
+        with self._lock:
+            waiters = self._waiters.get(key)
+            if waiters is None:
+                return
+
+            waiters.difference_update({w for w in waiters if w[1] is event})
+            if not waiters:
+                del self._waiters[key]
+
+    async def wait(self, event: asyncio.Event, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+        event.clear()
+        return True
+
+    def notify(self, key: str):
+        # safe to call from the sync routes' worker threads
+        self.broker.publish(f"wake:{key}", {})
+
+    def _wake(self, channel: str, payload: dict):
+        if not channel.startswith("wake:"):
+            return
+
+        key = channel.split(":", 1)[1]
+
+        with self._lock:
+            waiters = list(self._waiters.get(key, ()))
+
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+
+broker = LocalBroker()
+hub = ChatHub(broker)
+bus = EventBus(broker)
+
+
+def use_broker(new_broker: Broker):
+    global broker
+    broker = new_broker
+    hub.attach(new_broker)
+    bus.attach(new_broker)
@@ -84,6 +84,24 @@ class PostOut(PostBase):
     model_config = {"from_attributes": True}
 
 
+class PostPage(BaseModel):
+    items: list[PostOut]
+    nextCursor: Optional[str] = None
+
+
+# -------------------------
+# PROFILE SCHEMA (whole profile screen in one response)
+# -------------------------
+
+class ProfileOut(BaseModel):
+    user: UserOut
+    followerCount: int
+    followingCount: int
+    isFollowing: bool       # viewer -> user
+    isFollowedBy: bool      # user -> viewer
+    posts: PostPage         # first page, more from /profiles/{username}/posts
+
+
 # -------------------------
 # COMMENT SCHEMAS
 # -------------------------
@@ -120,6 +138,20 @@ class FollowOut(FollowBase):
     pass
 
 
+# relationship of viewer with each user of a list (search results, follower lists)
+class FollowBatchRequest(BaseModel):
+    viewer: Optional[str] = None
+    usernames: list[str]
+
+
+class FollowRelationOut(BaseModel):
+    username: str
+    isFollowing: bool       # viewer -> username
+    isFollowedBy: bool      # username -> viewer
+    followerCount: int
+    followingCount: int
+
+
 # -------------------------
 # CHAT MESSAGE SCHEMAS
 # -------------------------
@@ -143,6 +175,30 @@ class ChatMessageOut(ChatMessageCreate):
     isRead: bool
 
 
+# /chat/send when the receiver doesn't follow the sender back
+class ChatRequestPending(BaseModel):
+    status: str = "request_pending"
+    message: str
+
+
+class ConversationSummaryOut(BaseModel):
+    partnerUsername: str
+    lastMessageId: Optional[int] = None
+    lastSender: Optional[str] = None
+    lastMessage: str = ""
+    lastTimestamp: Optional[int] = None
+    lastIsVoice: bool = False
+    lastEmoji: Optional[str] = None
+    unreadCount: int = 0
+
+    model_config = {"from_attributes": True}
+
+
+class InboxPage(BaseModel):
+    items: list[ConversationSummaryOut]
+    nextCursor: Optional[str] = None
+
+
 # -------------------------
 # NOTIFICATION SCHEMAS
 # -------------------------
@@ -168,4 +224,5 @@ class NotificationCreate(BaseModel):
 
 
 class NotificationOut(NotificationCreate):
+    seq: int                # stream / poll cursor
     seen: bool
@@ -0,0 +1,111 @@
+import json
+import os
+
+from fastapi.responses import Response
+
+from . import models
+
+try:
+    import orjson
+except ImportError:     # optional, the stdlib encoder is the fallback
+    orjson = None
+
+# Fast path for big list responses: routes select only the response columns
+# (plain row tuples, no ORM identity map), turn them into dicts with the
+# response model's field names and encode them straight to JSON bytes,
+# skipping response_model validation. The columns are the ones the
+# response models declare, so the payload is the same.
+# Routes opt in by name; FAST_JSON_ROUTES="" turns the fast path off.
+
+FAST_JSON_ROUTES = {
+    name.strip()
+    for name in os.getenv("FAST_JSON_ROUTES", "feed,timeline,comments,conversation,notifications").split(",")
+    if name.strip()
+}
+
+
+def enabled(route: str) -> bool:
+    return route in FAST_JSON_ROUTES
+
+
+# -------------------------
+# PROJECTIONS (same fields as the response models)
+# -------------------------
+
+# schemas.PostOut, isLiked is added per viewer
+POST_COLUMNS = (
+    models.Post.id,
+    models.Post.username,
+    models.Post.caption,
+    models.Post.imageUri,
+    models.Post.imageResId,
+    models.Post.likeCount,
+    models.Post.timestamp,
+    models.Post.commentCount,
+)
+
+# schemas.CommentOut
+COMMENT_COLUMNS = (
+    models.Comment.id,
+    models.Comment.postId,
+    models.Comment.username,
+    models.Comment.text,
+    models.Comment.timestamp,
+)
+
+# chat.message_to_dict / schemas.ChatMessageOut
+MESSAGE_COLUMNS = (
+    models.ChatMessage.id,
+    models.ChatMessage.sender,
+    models.ChatMessage.receiver,
+    models.ChatMessage.message,
+    models.ChatMessage.timestamp,
+    models.ChatMessage.isVoice,
+    models.ChatMessage.emoji,
+    models.ChatMessage.isRead,
+)
+
+# schemas.NotificationOut
+NOTIFICATION_COLUMNS = (
+    models.Notification.seq,
+    models.Notification.id,
+    models.Notification.username,
+    models.Notification.message,
+    models.Notification.timestamp,
+    models.Notification.seen,
+    models.Notification.type,
+    models.Notification.targetUsername,
+)
+
+
+def rows_to_dicts(rows, columns) -> list[dict]:
+    keys = [c.key for c in columns]
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def post_dicts(rows, liked: set) -> list[dict]:
+    items = rows_to_dicts(rows, POST_COLUMNS)
+    for item in items:
+        # counters may still be NULL on rows older than the columns
+        item["likeCount"] = item["likeCount"] or 0
+        item["commentCount"] = item["commentCount"] or 0
+        item["isLiked"] = item["id"] in liked
+    return items
+
+
+# -------------------------
+# ENCODING
+# -------------------------
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    # same output as Starlette's JSONResponse
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,347 @@
+import hashlib
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+
+from sqlalchemy import UniqueConstraint, event
+from sqlalchemy.engine import Engine
+
+# Slow query log: statements over SLOW_QUERY_MS are grouped by fingerprint
+# (literals and IN lists normalized away), each new fingerprint gets its
+# EXPLAIN plan captured on a separate connection, and the columns they filter
+# and sort on are checked against the indexes declared in models.py to
+# suggest missing ones. Served at /metrics/slow-queries; with SLOW_QUERY_LOG
+# set, every slow statement is also appended there as a JSON line, and
+#   python -m API.slow_queries <log file>
+# prints the index advisory offline.
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG")
+
+MAX_FINGERPRINTS = 500
+PARAMS_PREVIEW = 200        # characters of repr(parameters) kept per sample
+EXPLAIN_QUEUE_SIZE = 100
+
+EXPLAINABLE = ("select", "update", "delete")
+
+_lock = threading.Lock()
+_fingerprints = {}          # fingerprint id -> aggregate dict
+_explain_queue = queue.Queue(maxsize=EXPLAIN_QUEUE_SIZE)
+_explain_thread = None
+_explain_engine = None      # sync engine on the same schema (async engines can't be used from a thread)
+
+
+# -------------------------
+# FINGERPRINTS
+# -------------------------
+
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"%\(\w+\)s|%s|\?|:\w+")
+_IN_LIST_RE = re.compile(r"\bin\s*\((?:\s*\?\s*,?)+\)")
+_SPACE_RE = re.compile(r"\s+")
+
+_QUOTE = r"[`\"]?"
+_COLUMN = rf"{_QUOTE}(\w+){_QUOTE}\.{_QUOTE}(\w+){_QUOTE}"
+_FILTER_RE = re.compile(rf"{_COLUMN}\s*(=|!=|<>|<=|>=|<|>|\bIN\b|\bLIKE\b|\bIS\b|\bBETWEEN\b)", re.IGNORECASE)
+_ORDER_RE = re.compile(r"\bORDER BY\b(.*?)(?:\bLIMIT\b|\bOFFSET\b|\bFOR UPDATE\b|$)", re.IGNORECASE | re.DOTALL)
+_ORDER_COLUMN_RE = re.compile(_COLUMN)
+
+
+def fingerprint(statement: str) -> str:
+    sql = _STRING_RE.sub("?", statement)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _PLACEHOLDER_RE.sub("?", sql)
+    sql = _SPACE_RE.sub(" ", sql).strip().lower()
+    return _IN_LIST_RE.sub("in (...)", sql)
+
+
+def fingerprint_id(normalized: str) -> str:
+    return hashlib.md5(normalized.encode()).hexdigest()[:12]
+
+
+def columns_used(statement: str) -> dict:
+    # table -> {"eq": [...], "range": [...], "order": [...]} in order of appearance
+    used = {}
+
+    def add(table, kind, column):
+        cols = used.setdefault(table, {"eq": [], "range": [], "order": []})
+        if column not in cols["eq"] and column not in cols[kind]:
+            cols[kind].append(column)
+
+    where = re.split(r"\bWHERE\b", statement, maxsplit=1, flags=re.IGNORECASE)
+    if len(where) == 2:
+        for table, column, op in _FILTER_RE.findall(where[1]):
+            kind = "eq" if op.upper() in ("=", "IN", "IS") else "range"
+            add(table, kind, column)
+
+    order = _ORDER_RE.search(statement)
+    if order:
+        for table, column in _ORDER_COLUMN_RE.findall(order.group(1)):
+            add(table, "order", column)
+
+    for cols in used.values():
+        cols["range"] = [c for c in cols["range"] if c not in cols["eq"]]
+        cols["order"] = [c for c in cols["order"] if c not in cols["eq"]]
+
+    return used
+
+
+# -------------------------
+# RECORDING
+# -------------------------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["slow_query_started"].pop()) * 1000
+
+    if elapsed_ms < SLOW_QUERY_MS or statement.lstrip().lower().startswith("explain"):
+        return
+
+    record(statement, None if executemany else parameters, elapsed_ms)
+
+
+def record(statement: str, parameters, elapsed_ms: float):
+    normalized = fingerprint(statement)
+    fid = fingerprint_id(normalized)
+    params = repr(parameters)[:PARAMS_PREVIEW]
+    new = False
+
+    with _lock:
+        agg = _fingerprints.get(fid)
+        if agg is None:
+            if len(_fingerprints) >= MAX_FINGERPRINTS:
+                return
+            agg = _fingerprints[fid] = {
+                "id": fid,
+                "fingerprint": normalized,
+                "count": 0,
+                "totalMs": 0.0,
+                "maxMs": 0.0,
+                "sample": statement,
+                "sampleParams": params,
+                "columns": columns_used(statement),
+                "plan": None,
+            }
+            new = True
+
+        agg["count"] += 1
+        agg["totalMs"] += elapsed_ms
+        if elapsed_ms >= agg["maxMs"]:
+            agg["maxMs"] = elapsed_ms
+            agg["sample"], agg["sampleParams"] = statement, params
+
+    if new and _explain_engine is not None and parameters is not None and normalized.startswith(EXPLAINABLE):
+        _queue_explain(fid, statement, parameters)
+
+    if SLOW_QUERY_LOG:
+        _append_log(fid, normalized, statement, params, elapsed_ms)
+
+
+def _append_log(fid: str, normalized: str, statement: str, params: str, elapsed_ms: float):
+    line = json.dumps({
+        "time": int(time.time() * 1000),
+        "id": fid,
+        "fingerprint": normalized,
+        "statement": statement,
+        "params": params,
+        "ms": round(elapsed_ms, 2),
+    })
+    with _lock:
+        with open(SLOW_QUERY_LOG, "a") as f:
+            f.write(line + "\n")
+
+
+# -------------------------
+# EXPLAIN (background, separate connection)
+# -------------------------
+
+def _queue_explain(fid: str, statement: str, parameters):
+    global _explain_thread
+
+    try:
+        _explain_queue.put_nowait((fid, statement, parameters))
+    except queue.Full:
+        return
+
+    with _lock:
+        if _explain_thread is None:
+            _explain_thread = threading.Thread(target=_explain_worker, daemon=True)
+            _explain_thread.start()
+
+
+def explain(engine, statement: str, parameters) -> list:
+    prefix = "EXPLAIN QUERY PLAN" if engine.dialect.name == "sqlite" else "EXPLAIN"
+
+    with engine.connect() as conn:
+        result = conn.exec_driver_sql(f"{prefix} {statement}", parameters)
+        columns = list(result.keys())
+        return [dict(zip(columns, row)) for row in result.fetchall()]
+
+
+def _explain_worker():
+    while True:
+        fid, statement, parameters = _explain_queue.get()
+        try:
+            plan = explain(_explain_engine, statement, parameters)
+        except Exception as e:
+            plan = [{"error": str(e)}]
+
+        with _lock:
+            if fid in _fingerprints:
+                _fingerprints[fid]["plan"] = plan
+
+
+def full_scans(plan: list) -> list[str]:
+    # tables read without an index: MySQL type=ALL, SQLite "SCAN <table>" without an index
+    tables = []
+    for row in plan or ():
+        if str(row.get("type", "")).upper() == "ALL":
+            tables.append(row.get("table"))
+        detail = str(row.get("detail", ""))
+        if detail.startswith("SCAN ") and "INDEX" not in detail.upper():
+            tables.append(detail.split()[1])
+    return tables
+
+
+# -------------------------
+# INDEX ADVISORY
+# -------------------------
+
+def _index_columns(table) -> list[tuple]:
+    # (columns, unique) for the primary key, indexes and unique constraints
+    indexes = [([c.name for c in table.primary_key.columns], True)]
+    indexes += [([c.name for c in index.columns], bool(index.unique)) for index in table.indexes]
+    indexes += [
+        ([c.name for c in constraint.columns], True)
+        for constraint in table.constraints
+        if isinstance(constraint, UniqueConstraint)
+    ]
+    indexes += [([c.name], True) for c in table.columns if c.unique]
+    return [(cols, unique) for cols, unique in indexes if cols]
+
+
+def _serves(index: list[str], unique: bool, eq: list[str], tail, pk: list[str]) -> bool:
+    # leading columns are the equality columns (any order), then the range/sort column
+    if set(index[:len(eq)]) != set(eq):
+        return False
+    if tail is None or index[len(eq):len(eq) + 1] == [tail]:
+        return True
+
+    # a unique match returns one row; InnoDB appends the primary key to every index
+    return (unique and len(index) == len(eq)) or (bool(eq) and [tail] == pk)
+
+
+def advise(metadata, entries: list[dict]) -> list[dict]:
+    # entries: {"id", "columns", "count", "totalMs", "plan"} per fingerprint
+    advice = {}
+
+    for entry in entries:
+        scanned = set(full_scans(entry.get("plan")))
+
+        for table_name, cols in entry["columns"].items():
+            table = metadata.tables.get(table_name)
+            if table is None:
+                continue
+
+            eq = [c for c in cols["eq"] if c in table.c]
+            tail = next((c for c in cols["range"] + cols["order"] if c in table.c), None)
+            if not eq and tail is None:
+                continue
+
+            existing = _index_columns(table)
+            pk = [c.name for c in table.primary_key.columns]
+            if any(_serves(index, unique, eq, tail, pk) for index, unique in existing):
+                continue
+
+            columns = eq + ([tail] if tail else [])
+            key = (table_name, tuple(columns))
+
+            item = advice.get(key)
+            if item is None:
+                name = f"ix_{table_name}_{'_'.join(c.lower() for c in columns)}"[:64]
+                item = advice[key] = {
+                    "table": table_name,
+                    "columns": columns,
+                    "ddl": f"CREATE INDEX {name} ON {table_name} ({', '.join(columns)});",
+                    "existingIndexes": [index for index, _ in existing],
+                    "fullScan": False,
+                    "fingerprints": [],
+                    "count": 0,
+                    "totalMs": 0.0,
+                }
+
+            item["fullScan"] = item["fullScan"] or table_name in scanned
+            item["fingerprints"].append(entry["id"])
+            item["count"] += entry["count"]
+            item["totalMs"] += entry["totalMs"]
+
+    return sorted(advice.values(), key=lambda item: (-item["fullScan"], -item["totalMs"]))
+
+
+def report(metadata) -> dict:
+    with _lock:
+        entries = [dict(agg) for agg in _fingerprints.values()]
+
+    entries.sort(key=lambda agg: -agg["totalMs"])
+    for agg in entries:
+        agg["avgMs"] = round(agg["totalMs"] / agg["count"], 2)
+        agg["totalMs"] = round(agg["totalMs"], 2)
+        agg["maxMs"] = round(agg["maxMs"], 2)
+        agg["fullScans"] = full_scans(agg["plan"])
+
+    return {
+        "thresholdMs": SLOW_QUERY_MS,
+        "queries": entries,
+        "indexAdvice": advise(metadata, entries),
+    }
+
+
+def reset():
+    with _lock:
+        _fingerprints.clear()
+
+
+def install(explain_engine=None):
+    global _explain_engine
+    _explain_engine = explain_engine
+
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# -------------------------
+# OFFLINE (python -m API.slow_queries <log file>)
+# -------------------------
+
+def advise_from_log(metadata, path: str) -> list[dict]:
+    entries = {}
+
+    with open(path) as f:
+        for line in f:
+            row = json.loads(line)
+            entry = entries.setdefault(row["id"], {
+                "id": row["id"],
+                "columns": columns_used(row["statement"]),
+                "count": 0,
+                "totalMs": 0.0,
+                "plan": None,
+            })
+            entry["count"] += 1
+            entry["totalMs"] += row["ms"]
+
+    return advise(metadata, list(entries.values()))
+
+
+if __name__ == "__main__":
+    from .models import Base
+
+    for item in advise_from_log(Base.metadata, sys.argv[1]):
+        print(f"{item['ddl']:<80} -- {item['count']} slow runs, {item['totalMs']:.0f} ms total")
@@ -0,0 +1,146 @@
+from typing import Optional
+
+from sqlalchemy import insert, literal, select
+from sqlalchemy.orm import Session
+
+from . import models, serialization
+from .follower_counts import follower_count
+from .feed import apply_cursor, page_post_rows, page_posts
+
+# authors with more followers than this are not fanned out on write,
+# their posts are pulled into followers' timelines when they are read
+FANOUT_MAX_FOLLOWERS = 5000
+
+# recent posts copied into a timeline when a new follow starts
+FOLLOW_BACKFILL = 50
+
+TIMELINE_COLUMNS = ["ownerUsername", "postId", "authorUsername", "timestamp"]
+
+
+def is_fanout_exempt(db: Session, username: str) -> bool:
+    return follower_count(db, username) > FANOUT_MAX_FOLLOWERS
+
+
+def exempt_followees(db: Session, username: str) -> list[str]:
+    # followerCount is on users, no COUNT(*) over the big accounts' followers
+    rows = db.query(models.Follow.followedUsername).join(
+        models.User,
+        models.User.username == models.Follow.followedUsername
+    ).filter(
+        models.Follow.followerUsername == username,
+        models.User.followerCount > FANOUT_MAX_FOLLOWERS
+    ).all()
+
+    return [r.followedUsername for r in rows]
+
+
+# -------------------------
+# WRITE PATH
+# -------------------------
+
+def fan_out_post(db: Session, post: models.Post):
+    # the post must already be flushed so it has an id
+    db.add(models.TimelineEntry(
+        ownerUsername=post.username,
+        postId=post.id,
+        authorUsername=post.username,
+        timestamp=post.timestamp
+    ))
+
+    if is_fanout_exempt(db, post.username):
+        return
+
+    followers = select(
+        models.Follow.followerUsername,
+        literal(post.id, models.TimelineEntry.postId.type),
+        literal(post.username, models.TimelineEntry.authorUsername.type),
+        literal(post.timestamp, models.TimelineEntry.timestamp.type)
+    ).where(
+        models.Follow.followedUsername == post.username
+    )
+
+    db.execute(insert(models.TimelineEntry).from_select(TIMELINE_COLUMNS, followers))
+
+
+def remove_post(db: Session, post_id: int):
+    db.query(models.TimelineEntry).filter(
+        models.TimelineEntry.postId == post_id
+    ).delete(synchronize_session=False)
+
+
+def backfill_author(db: Session, owner: str, author: str):
+    # run after the follow is committed, in its own transaction: a post the
+    # author commits meanwhile is then either seen here or fanned out to the
+    # new follower. Both may copy it, so rows already there are skipped
+    # (anti-join, and INSERT IGNORE for a fan-out committing in between).
+    if is_fanout_exempt(db, author):
+        return
+
+    already = select(models.TimelineEntry.postId).where(
+        models.TimelineEntry.ownerUsername == owner,
+        models.TimelineEntry.postId == models.Post.id
+    ).exists()
+
+    recent = select(
+        literal(owner, models.TimelineEntry.ownerUsername.type),
+        models.Post.id,
+        models.Post.username,
+        models.Post.timestamp
+    ).where(
+        models.Post.username == author,
+        ~already
+    ).order_by(
+        models.Post.timestamp.desc()
+    ).limit(FOLLOW_BACKFILL)
+
+    db.execute(
+        insert(models.TimelineEntry)
+        .from_select(TIMELINE_COLUMNS, recent)
+        .prefix_with("IGNORE", dialect="mysql")
+        .prefix_with("OR IGNORE", dialect="sqlite")
+    )
+
+
+def remove_author(db: Session, owner: str, author: str):
+    db.query(models.TimelineEntry).filter(
+        models.TimelineEntry.ownerUsername == owner,
+        models.TimelineEntry.authorUsername == author
+    ).delete(synchronize_session=False)
+
+
+# -------------------------
+# READ PATH
+# -------------------------
+
+def read_timeline(db: Session, username: str, before: Optional[str], limit: int, fast: bool = False) -> dict:
+    # fast: column rows and plain dicts (serialization.POST_COLUMNS) instead of Post objects
+    selected = serialization.POST_COLUMNS if fast else (models.Post,)
+
+    query = db.query(*selected).join(
+        models.TimelineEntry,
+        models.TimelineEntry.postId == models.Post.id
+    ).filter(
+        models.TimelineEntry.ownerUsername == username
+    )
+
+    posts = apply_cursor(
+        query, before, models.TimelineEntry.timestamp, models.TimelineEntry.postId
+    ).limit(limit + 1).all()
+
+    # pull-on-read for followed accounts that are too big to fan out
+    exempt = exempt_followees(db, username)
+    if exempt:
+        pulled = apply_cursor(
+            db.query(*selected).filter(models.Post.username.in_(exempt)), before
+        ).limit(limit + 1).all()
+
+        merged = {p.id: p for p in posts + pulled}
+        posts = sorted(
+            merged.values(),
+            key=lambda p: (p.timestamp or 0, p.id),
+            reverse=True
+        )[:limit + 1]
+
+    if fast:
+        return page_post_rows(db, posts, username, limit)
+    return page_posts(db, posts, username, limit)
@@ -0,0 +1,150 @@
+import math
+import threading
+import time
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from . import models, counters
+
+# Trending posts: every like/comment adds weight * 2^(age / half-life) to the
+# post's score, so an event counts twice as much as one from a half-life ago
+# and old posts fade out without ever being rescored. Scores are kept
+# relative to the start of an era so the exponent stays small; when a new
+# era starts every row is rescaled once. Deltas arrive through the counter
+# flusher, and the table is pruned to a bounded leaderboard.
+
+HALF_LIFE_HOURS = 24
+ERA_HOURS = 30 * 24
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+
+LEADERBOARD_SIZE = 1000             # rows kept after pruning
+PRUNE_INTERVAL_SECONDS = 300
+
+HOUR_MS = 3600 * 1000
+
+_lock = threading.Lock()
+_next_prune_at = 0.0
+
+
+def current_era(now_ms: int) -> int:
+    return now_ms // (ERA_HOURS * HOUR_MS)
+
+
+def event_weight(now_ms: int, era: int) -> float:
+    hours = (now_ms - era * ERA_HOURS * HOUR_MS) / HOUR_MS
+    return math.pow(2, hours / HALF_LIFE_HOURS)
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+# -------------------------
+# WRITE PATH (counter flush listener)
+# -------------------------
+
+def rebase(db: Session, era: int):
+    # rows scored in an older era are scaled into the current one
+    old_eras = [
+        e for (e,) in db.query(models.TrendingScore.era).filter(
+            models.TrendingScore.era < era
+        ).distinct().all()
+    ]
+
+    for old in old_eras:
+        factor = math.pow(2, -(era - old) * ERA_HOURS / HALF_LIFE_HOURS)
+        db.query(models.TrendingScore).filter(
+            models.TrendingScore.era == old
+        ).update(
+            {"score": models.TrendingScore.score * factor, "era": era},
+            synchronize_session=False
+        )
+
+
+def apply_deltas(db: Session, batch: dict):
+    if not batch:
+        return
+
+    now = _now_ms()
+    era = current_era(now)
+    weight = event_weight(now, era)
+    table = models.TrendingScore.__table__
+
+    rebase(db, era)
+
+    # deltas can still be pending for a post deleted since
+    existing = {
+        post_id for (post_id,) in db.query(models.Post.id).filter(
+            models.Post.id.in_(list(batch))
+        ).all()
+    }
+
+    for post_id, deltas in batch.items():
+        if post_id not in existing:
+            continue
+
+        # unlikes / deleted comments don't lower the score, decay takes care of it
+        points = (
+            LIKE_WEIGHT * max(deltas["likeCount"], 0)
+            + COMMENT_WEIGHT * max(deltas["commentCount"], 0)
+        )
+        if points:
+            counters.upsert_add(
+                db, table, {"postId": post_id}, "score", points * weight, {"era": era}
+            )
+
+    prune(db)
+
+
+def remove_post(db: Session, post_id: int):
+    db.query(models.TrendingScore).filter(
+        models.TrendingScore.postId == post_id
+    ).delete(synchronize_session=False)
+
+
+def prune(db: Session, force: bool = False) -> int:
+    global _next_prune_at
+
+    now = time.monotonic()
+    with _lock:
+        if not force and now < _next_prune_at:
+            return 0
+        _next_prune_at = now + PRUNE_INTERVAL_SECONDS
+
+    # last row that stays on the leaderboard
+    cutoff = db.query(models.TrendingScore.era, models.TrendingScore.score).order_by(
+        models.TrendingScore.era.desc(), models.TrendingScore.score.desc()
+    ).offset(LEADERBOARD_SIZE - 1).limit(1).first()
+
+    if cutoff is None:
+        return 0
+
+    return db.query(models.TrendingScore).filter(
+        or_(
+            models.TrendingScore.era < cutoff.era,
+            and_(
+                models.TrendingScore.era == cutoff.era,
+                models.TrendingScore.score < cutoff.score
+            )
+        )
+    ).delete(synchronize_session=False)
+
+
+counters.add_flush_listener(apply_deltas)
+
+
+# -------------------------
+# READ PATH
+# -------------------------
+
+def top_posts(db: Session, limit: int) -> list:
+    # rows of an older era are only left over until the next flush rescales them
+    return db.query(models.Post).join(
+        models.TrendingScore,
+        models.TrendingScore.postId == models.Post.id
+    ).order_by(
+        models.TrendingScore.era.desc(),
+        models.TrendingScore.score.desc()
+    ).limit(limit).all()
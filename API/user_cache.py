@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Identity + ban state of users, shared by the write endpoints so they don't
+# load the whole users row on every request. Entries expire after a TTL and
+# are dropped early through the cache_invalidations table, which the
+# BackOffice writes to when it bans or deletes someone.
+
+CACHE_MAX_ENTRIES = 10000
+CACHE_TTL_SECONDS = 60
+INVALIDATION_POLL_SECONDS = 2
+INVALIDATION_RETENTION_MS = 24 * 3600 * 1000
+INVALIDATION_RESCAN_IDS = 100      # ids below the watermark read again on every poll
+
+
+class UserState(NamedTuple):
+    id: int
+    username: str
+    is_banned: bool
+
+
+_lock = threading.Lock()
+_entries = OrderedDict()    # username -> (expires_at, UserState or None)
+_listeners = []             # called with the username (None = everyone)
+
+_poll_lock = threading.Lock()   # guards the three below
+_last_invalidation_id = None
+_seen_invalidation_ids = set()  # already applied, inside the rescan window
+_next_poll_at = 0.0
+
+
+# -------------------------
+# LOOKUP
+# -------------------------
+
+def get_user_state(db: Session, username: str) -> Optional[UserState]:
+    # None means the user does not exist (also cached, for the TTL)
+    sync_invalidations(db)
+
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(username)
+        if entry is not None and entry[0] > now:
+            _entries.move_to_end(username)
+            return entry[1]
+
+    row = db.query(
+        models.User.id, models.User.username, models.User.is_banned
+    ).filter(models.User.username == username).first()
+
+    state = UserState(row.id, row.username, bool(row.is_banned)) if row else None
+    put(username, state)
+
+    return state
+
+
+def put(username: str, state: Optional[UserState]):
+    with _lock:
+        _entries[username] = (time.monotonic() + CACHE_TTL_SECONDS, state)
+        _entries.move_to_end(username)
+
+        while len(_entries) > CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+
+
+def remember(user: models.User):
+    put(user.username, UserState(user.id, user.username, bool(user.is_banned)))
+
+
+# -------------------------
+# INVALIDATION
+# -------------------------
+
+def add_listener(callback):
+    # other per-worker caches keyed by user (e.g. the search index) hook in here
+    _listeners.append(callback)
+
+
+def invalidate(username: Optional[str] = None):
+    # this worker only
+    with _lock:
+        if username is None:
+            _entries.clear()
+        else:
+            _entries.pop(username, None)
+
+    for callback in _listeners:
+        callback(username)
+
+
+def publish_invalidation(db: Session, username: Optional[str]):
+    # this worker now, every other worker on their next poll;
+    # committed together with the caller's change
+    invalidate(username)
+    db.add(models.CacheInvalidation(
+        username=username,
+        timestamp=int(time.time() * 1000)
+    ))
+
+
+def sync_invalidations(db: Session):
+    # one poll at a time per worker; requests arriving meanwhile use the
+    # cache as it is, like between two polls
+    if not _poll_lock.acquire(blocking=False):
+        return
+    try:
+        _poll(db)
+    finally:
+        _poll_lock.release()
+
+
+def _poll(db: Session):
+    # call with _poll_lock held
+    global _last_invalidation_id, _seen_invalidation_ids, _next_poll_at
+
+    now = time.monotonic()
+    if now < _next_poll_at:
+        return
+    _next_poll_at = now + INVALIDATION_POLL_SECONDS
+
+    first = _last_invalidation_id is None
+    if first:
+        # first poll only sets the watermark, the cache is still empty then
+        _last_invalidation_id = db.query(func.max(models.CacheInvalidation.id)).scalar() or 0
+
+    # auto-increment ids don't commit in order: a transaction holding a lower
+    # id can commit after a higher one was read, so a window below the
+    # watermark is read again and rows not applied yet are applied then
+    rows = db.query(
+        models.CacheInvalidation.id, models.CacheInvalidation.username
+    ).filter(
+        models.CacheInvalidation.id > _last_invalidation_id - INVALIDATION_RESCAN_IDS
+    ).order_by(models.CacheInvalidation.id.asc()).all()
+
+    if not first:
+        for r in rows:
+            if r.id not in _seen_invalidation_ids:
+                invalidate(r.username)
+
+    _seen_invalidation_ids = {r.id for r in rows}
+    if rows:
+        _last_invalidation_id = max(_last_invalidation_id, rows[-1].id)
+
+
+def prune_invalidations(db: Session) -> int:
+    cutoff = int(time.time() * 1000) - INVALIDATION_RETENTION_MS
+
+    deleted = db.query(models.CacheInvalidation).filter(
+        models.CacheInvalidation.timestamp < cutoff
+    ).delete(synchronize_session=False)
+    db.commit()
+
+    return deleted
@@ -0,0 +1,214 @@
+import bisect
+import threading
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from . import models, user_cache
+
+# In-memory type-ahead index over username and fullName, rebuilt from the
+# users table on first use. Changes reach it through the user cache
+# invalidation channel (create_user, update_user, BackOffice deletes), so
+# every worker stays current without rescanning the table.
+
+REBUILD_CHUNK_SIZE = 5000
+PREFIX_SCAN_LIMIT = 1000      # prefix entries examined per query
+SUBSTRING_SCAN_LIMIT = 5000   # trigram candidates verified per query
+
+
+def _normalize(text: Optional[str]) -> str:
+    return " ".join((text or "").lower().split())
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class UserSearchIndex:
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._docs = {}         # user id -> (username, fullName), normalized
+        self._names = {}        # user id -> username as stored
+        self._ids = {}          # username as stored -> user id
+        self._terms = []        # sorted (term, user id): username + fullName words
+        self._grams = {}        # trigram -> set of user ids
+        self._built = False
+        self._dirty = set()     # usernames to refresh from the database
+        self._stale = False     # everything must be rebuilt
+
+    # -------------------------
+    # MAINTENANCE
+    # -------------------------
+
+    def rebuild(self, db: Session):
+        with self._lock:
+            self._docs, self._names, self._ids, self._terms, self._grams = {}, {}, {}, [], {}
+            terms = []
+            last_id = 0
+
+            while True:
+                rows = db.query(
+                    models.User.id, models.User.username, models.User.fullName
+                ).filter(
+                    models.User.id > last_id
+                ).order_by(models.User.id.asc()).limit(REBUILD_CHUNK_SIZE).all()
+
+                if not rows:
+                    break
+
+                for r in rows:
+                    terms.extend(self._add(r.id, r.username, r.fullName))
+                last_id = rows[-1].id
+
+            # one sort instead of an insort per user
+            terms.sort()
+            self._terms = terms
+            self._built = True
+            self._stale = False
+            self._dirty.clear()
+
+    def mark_dirty(self, username: Optional[str]):
+        with self._lock:
+            if username is None:
+                self._stale = True
+            else:
+                self._dirty.add(username)
+
+    def upsert(self, user_id: int, username: str, full_name: str):
+        with self._lock:
+            self.remove(user_id)
+            for term in self._add(user_id, username, full_name):
+                bisect.insort(self._terms, term)
+
+    def remove(self, user_id: int):
+        with self._lock:
+            doc = self._docs.pop(user_id, None)
+            if doc is None:
+                return
+
+            username, full_name = doc
+            self._ids.pop(self._names.pop(user_id), None)
+
+            for term in self._doc_terms(user_id, username, full_name):
+                i = bisect.bisect_left(self._terms, term)
+                if i < len(self._terms) and self._terms[i] == term:
+                    del self._terms[i]
+
+            for gram in _trigrams(username) | _trigrams(full_name):
+                postings = self._grams.get(gram)
+                if postings is not None:
+                    postings.discard(user_id)
+                    if not postings:
+                        del self._grams[gram]
+
+    def _doc_terms(self, user_id: int, username: str, full_name: str) -> list:
+        words = {username} | set(full_name.split())
+        return [(w, user_id) for w in words]
+
+    def _add(self, user_id: int, username: str, full_name: str) -> list:
+        self._names[user_id] = username
+        self._ids[username] = user_id
+
+        username, full_name = _normalize(username), _normalize(full_name)
+        self._docs[user_id] = (username, full_name)
+
+        for gram in _trigrams(username) | _trigrams(full_name):
+            self._grams.setdefault(gram, set()).add(user_id)
+
+        return self._doc_terms(user_id, username, full_name)
+
+    def _refresh(self, db: Session):
+        user_cache.sync_invalidations(db)
+
+        with self._lock:
+            if not self._built or self._stale:
+                self.rebuild(db)
+                return
+
+            dirty, self._dirty = self._dirty, set()
+
+        if not dirty:
+            return
+
+        rows = db.query(
+            models.User.id, models.User.username, models.User.fullName
+        ).filter(models.User.username.in_(dirty)).all()
+
+        with self._lock:
+            found = set()
+            for r in rows:
+                self.upsert(r.id, r.username, r.fullName)
+                found.add(r.username)
+
+            # dirty names that no longer exist were deleted
+            for username in dirty - found:
+                if username in self._ids:
+                    self.remove(self._ids[username])
+
+    # -------------------------
+    # QUERY
+    # -------------------------
+
+    def search(self, db: Session, query: str, limit: int) -> list[int]:
+        self._refresh(db)
+
+        q = _normalize(query)
+        if not q:
+            return []
+
+        with self._lock:
+            scores = {}
+
+            def score(user_id: int, points: int):
+                if points > scores.get(user_id, 0):
+                    scores[user_id] = points
+
+            # 1) prefix hits on username / fullName words (sorted term list)
+            i = bisect.bisect_left(self._terms, (q,))
+            for term, user_id in self._terms[i:i + PREFIX_SCAN_LIMIT]:
+                if not term.startswith(q):
+                    break
+
+                username, _ = self._docs[user_id]
+                if username == q:
+                    score(user_id, 100)
+                elif term == username:
+                    score(user_id, 80)
+                else:
+                    score(user_id, 60)
+
+            # 2) substring hits anywhere, via the rarest trigrams first
+            grams = _trigrams(q)
+            if grams and len(scores) < limit:
+                postings = sorted((self._grams.get(g, set()) for g in grams), key=len)
+                candidates = set(postings[0])
+                for p in postings[1:]:
+                    candidates &= p
+                    if not candidates:
+                        break
+
+                for n, user_id in enumerate(candidates):
+                    if n >= SUBSTRING_SCAN_LIMIT:
+                        break
+
+                    username, full_name = self._docs[user_id]
+                    if q in username:
+                        score(user_id, 40)
+                    elif q in full_name:
+                        score(user_id, 20)
+
+            # best score first, then shorter (closer) usernames, then id
+            ranked = sorted(
+                scores,
+                key=lambda user_id: (-scores[user_id], len(self._docs[user_id][0]), user_id)
+            )
+            return ranked[:limit]
+
+
+index = UserSearchIndex()
+user_cache.add_listener(index.mark_dirty)
+
+
+def search(db: Session, query: str, limit: int) -> list[int]:
+    return index.search(db, query, limit)
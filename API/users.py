@@ -1,16 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from ..schemas import UserOut
 from ..models import User
 
-from .. import models, schemas
-from ..database import get_db
+from .. import models, schemas, counters, user_cache, user_search
+from ..database import get_db, get_read_db
+from ..instrumentation import InstrumentedRoute
 
 router = APIRouter(
     prefix="/users",
-    tags=["Users"]
+    tags=["Users"],
+    route_class=InstrumentedRoute
 )
 
+SEARCH_LIMIT = 20
+SEARCH_MAX_LIMIT = 50
+
 # =============================
 # CREATE USER
 # =============================
@@ -36,9 +41,13 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(new_user)
+    # a "not found" for this name may already be cached
+    user_cache.publish_invalidation(db, user.username)
     db.commit()
     db.refresh(new_user)
 
+    counters.record_rows("users")
+
     return new_user
 
 # =============================
@@ -67,7 +76,7 @@ def update_user(username: str, data: schemas.UserUpdate, db: Session = Depends(g
     if data.fullName is not None:
         user.fullName = data.fullName
 
- 
+    user_cache.publish_invalidation(db, username)
 
     db.commit()
     db.refresh(user)
@@ -78,19 +87,26 @@ def update_user(username: str, data: schemas.UserUpdate, db: Session = Depends(g
 # SEARCH USERS
 # =============================
 @router.get("/search", response_model=list[UserOut])
-def search_users(query: str, db: Session = Depends(get_db)):
-    return (
-        db.query(User)
-        .filter(User.username.like(f"%{query}%"))
-        .all()
-    )
+def search_users(
+    query: str,
+    limit: int = Query(SEARCH_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+    db: Session = Depends(get_read_db)
+):
+    # ranked ids from the in-memory index, then one primary-key lookup
+    ids = user_search.search(db, query, limit)
+    if not ids:
+        return []
+
+    users = {u.id: u for u in db.query(User).filter(User.id.in_(ids)).all()}
+
+    return [users[i] for i in ids if i in users]
 
 
 # =============================
 # GET ALL USERS
 # =============================
 @router.get("/", response_model=list[schemas.UserOut])
-def get_users(db: Session = Depends(get_db)):
+def get_users(db: Session = Depends(get_read_db)):
     return db.query(models.User).all()
 
 
@@ -98,7 +114,7 @@ def get_users(db: Session = Depends(get_db)):
 # GET USER BY USERNAME
 # =============================
 @router.get("/{username}", response_model=schemas.UserOut)
-def get_user(username: str, db: Session = Depends(get_db)):
+def get_user(username: str, db: Session = Depends(get_read_db)):
     user = db.query(models.User).filter(models.User.username == username).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -1,11 +1,52 @@
+import os
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-# Using MySQL with root user and NO password
-SQLALCHEMY_DATABASE_URL = "mysql+mysqlconnector://root@localhost/socialnetwork"
+# Same environment settings as the API (see API/database.py); the defaults
+# are MySQL with root user and NO password
+SQLALCHEMY_DATABASE_URL = os.getenv(
+    "DATABASE_URL", "mysql+mysqlconnector://root@localhost/socialnetwork"
+)
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+
+CONNECT_TIMEOUT_ARGS = {
+    "mysqlconnector": "connection_timeout",
+    "pymysql": "connect_timeout",
+    "mysqldb": "connect_timeout",
+}
+
+
+def make_engine(url: str):
+    driver = make_url(url).get_driver_name()
+
+    if url.startswith("sqlite"):
+        return create_engine(url, connect_args={"check_same_thread": False})
+
+    connect_args = {}
+    if driver in CONNECT_TIMEOUT_ARGS:
+        connect_args[CONNECT_TIMEOUT_ARGS[driver]] = DB_CONNECT_TIMEOUT
+
+    return create_engine(
+        url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args=connect_args
+    )
+
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -20,4 +61,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,24 @@
+import os
+import sys
+
+from sqlalchemy.orm import Session
+
+import models
+
+# The API's hashtag index (API/hashtags.py): per-hour tag counts in
+# hashtag_buckets, tag -> post rows in post_hashtags. Unindexing and the
+# trending query come from API/hashtag_index.py, the same code the API runs,
+# which imports nothing else from the API.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from API import hashtag_index    # noqa: E402
+
+
+def unindex_post(db: Session, post_id: int):
+    hashtag_index.unindex_post(
+        db, models.PostHashtag.__table__, models.HashtagBucket.__table__, post_id
+    )
+
+
+def trending(db: Session, hours: int, limit: int) -> list[dict]:
+    return hashtag_index.trending(db, models.HashtagBucket.__table__, hours, limit)
@@ -1,3 +1,5 @@
+import time
+
 from fastapi import FastAPI, Request, Form, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
 from starlette.templating import Jinja2Templates
@@ -5,6 +7,9 @@ from starlette.middleware.sessions import SessionMiddleware
 from fastapi import Depends
 from database import get_db
 import models
+import post_search
+import hashtags
+import stats
 from sqlalchemy import text
 from sqlalchemy import or_
 app = FastAPI(title="Backoffice - Social Network")
@@ -16,6 +21,37 @@ app.add_middleware(SessionMiddleware, secret_key="CHANGE_THIS_SECRET_KEY")
 ADMIN_USER = "admin"
 ADMIN_PASS = "admin123"
 
+POSTS_PAGE_SIZE = 50
+TRENDING_WINDOW_HOURS = 7 * 24
+
+# dashboard label -> table
+DASHBOARD_TABLES = {
+    "users": "users",
+    "posts": "posts",
+    "comments": "comments",
+    "follows": "follows",
+    "messages": "messages",
+    "likes": "post_likes",
+    "notifications": "notifications",
+    "chat_requests": "chat_requests",
+}
+ANALYTICS_STATS = ("users", "posts", "comments", "likes")
+
+
+def table_stats(db, labels, mode: str, refresh: bool) -> dict:
+    # one read of the table_stats rollup; refresh=1 forces a recount now
+    if mode not in stats.MODES:
+        mode = stats.STATS_MODE
+    max_age = 0 if refresh else stats.STATS_MAX_AGE_SECONDS
+
+    counts = stats.get_counts(db, [DASHBOARD_TABLES[l] for l in labels], mode, max_age)
+    return {l: counts[DASHBOARD_TABLES[l]] for l in labels}
+
+
+def invalidate_user_cache(db, username: str):
+    # tells the API workers to forget their cached copy of this user
+    db.add(models.CacheInvalidation(username=username, timestamp=int(time.time() * 1000)))
+
 
 def require_admin(request: Request):
     if request.session.get("is_admin") is True:
@@ -51,59 +87,44 @@ from sqlalchemy import text
 
 
 @app.get("/dashboard", response_class=HTMLResponse)
-def dashboard(request: Request, db=Depends(get_db)):
+def dashboard(request: Request, mode: str = stats.STATS_MODE, refresh: bool = False, db=Depends(get_db)):
     ok = require_admin(request)
     if ok is not True:
         return ok
 
-
-    def table_count(table_name: str) -> int:
-        return db.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar() or 0
-
-
-    stats = {
-        "users": table_count("users"),
-        "posts": table_count("posts"),
-        "comments": table_count("comments"),
-        "follows": table_count("follows"),
-        "messages": table_count("messages"),
-        "likes": table_count("post_likes"),
-        "notifications": table_count("notifications"),
-        "chat_requests": table_count("chat_requests"),
-    }
-
+    counts = table_stats(db, DASHBOARD_TABLES, mode, refresh)
 
     return templates.TemplateResponse(
         "dashboard.html",
-        {"request": request, "stats": stats}
+        {"request": request, "stats": counts}
     )
 
 @app.get("/posts", response_class=HTMLResponse)
-def posts_page(request: Request, q: str = "", db=Depends(get_db)):
+def posts_page(request: Request, q: str = "", page: int = 1, db=Depends(get_db)):
     ok = require_admin(request)
     if ok is not True:
         return ok
 
-
-    query = db.query(models.Post)
-
+    page = max(page, 1)
 
     if q:
-        like = f"%{q}%"
-        query = query.filter(
-            or_(
-                models.Post.caption.ilike(like),
-                models.Post.username.ilike(like)
-            )
+        # ranked search on the post_terms index, no table scan
+        posts, has_next = post_search.search(db, q, page, POSTS_PAGE_SIZE)
+    else:
+        posts = (
+            db.query(models.Post)
+            .order_by(models.Post.id.desc())
+            .offset((page - 1) * POSTS_PAGE_SIZE)
+            .limit(POSTS_PAGE_SIZE + 1)
+            .all()
         )
-
-
-    posts = query.order_by(models.Post.id.desc()).all()
+        has_next = len(posts) > POSTS_PAGE_SIZE
+        posts = posts[:POSTS_PAGE_SIZE]
 
 
     return templates.TemplateResponse(
         "posts.html",
-        {"request": request, "posts": posts, "q": q}
+        {"request": request, "posts": posts, "q": q, "page": page, "has_next": has_next}
     )
 
 @app.get("/posts/{post_id}", response_class=HTMLResponse)
@@ -130,12 +151,19 @@ def delete_post(post_id: int, request: Request, db=Depends(get_db)):
 
     try:
         # delete related likes + comments first (IMPORTANT: uses postId)
-        db.query(models.PostLike).filter(models.PostLike.postId == post_id).delete(synchronize_session=False)
-        db.query(models.Comment).filter(models.Comment.postId == post_id).delete(synchronize_session=False)
+        likes = db.query(models.PostLike).filter(models.PostLike.postId == post_id).delete(synchronize_session=False)
+        comments = db.query(models.Comment).filter(models.Comment.postId == post_id).delete(synchronize_session=False)
+        stats.adjust(db, "post_likes", -likes)
+        stats.adjust(db, "comments", -comments)
+        db.query(models.TimelineEntry).filter(models.TimelineEntry.postId == post_id).delete(synchronize_session=False)
+        post_search.unindex_post(db, post_id)
+        hashtags.unindex_post(db, post_id)
+        db.query(models.TrendingScore).filter(models.TrendingScore.postId == post_id).delete(synchronize_session=False)
 
         p = db.query(models.Post).filter(models.Post.id == post_id).first()
         if p:
             db.delete(p)
+            stats.adjust(db, "posts", -1)
 
         db.commit()
     except Exception as e:
@@ -210,6 +238,7 @@ def toggle_ban_user(user_id: int, request: Request, db=Depends(get_db)):
     u = db.query(models.User).filter(models.User.id == user_id).first()
     if u:
         u.is_banned = not bool(u.is_banned)
+        invalidate_user_cache(db, u.username)
         db.commit()
 
     return RedirectResponse(url="/users", status_code=302)
@@ -223,59 +252,39 @@ def delete_user(user_id: int, request: Request, db=Depends(get_db)):
 
     u = db.query(models.User).filter(models.User.id == user_id).first()
     if u:
+        invalidate_user_cache(db, u.username)
         db.delete(u)
+        stats.adjust(db, "users", -1)
         db.commit()
 
     return RedirectResponse(url="/users", status_code=302)
 
 
 @app.get("/analytics", response_class=HTMLResponse)
-def analytics_page(request: Request, db=Depends(get_db)):
+def analytics_page(request: Request, mode: str = stats.STATS_MODE, refresh: bool = False, db=Depends(get_db)):
     ok = require_admin(request)
     if ok is not True:
         return ok
 
-    def table_count(table_name: str) -> int:
-        return db.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar() or 0
-
-    stats = {
-        "users": table_count("users"),
-        "posts": table_count("posts"),
-        "comments": table_count("comments"),
-        "likes": table_count("post_likes"),
-    }
+    counts = table_stats(db, ANALYTICS_STATS, mode, refresh)
 
-    # Trending posts (most likes, then comments)
+    # Trending posts (time-decayed leaderboard maintained by the API)
     trending_posts = (
         db.query(models.Post)
-        .order_by(models.Post.likeCount.desc(), models.Post.commentCount.desc())
+        .join(models.TrendingScore, models.TrendingScore.postId == models.Post.id)
+        .order_by(models.TrendingScore.era.desc(), models.TrendingScore.score.desc())
         .limit(10)
         .all()
     )
 
-    # Trending hashtags (basic extraction from caption)
-    import re
-    tag_counts = {}
-    all_posts = db.query(models.Post.caption).all()
-
-    for (caption,) in all_posts:
-        if not caption:
-            continue
-        tags = re.findall(r"#\w+", caption)
-        for t in tags:
-            t = t.lower()
-            tag_counts[t] = tag_counts.get(t, 0) + 1
-
-    trending_hashtags = [
-        {"tag": k, "count": v}
-        for k, v in sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-    ]
+    # Trending hashtags (hourly counts kept by the API on post create/delete)
+    trending_hashtags = hashtags.trending(db, TRENDING_WINDOW_HOURS, 10)
 
     return templates.TemplateResponse(
         "analytics.html",
         {
             "request": request,
-            "stats": stats,
+            "stats": counts,
             "trending_posts": trending_posts,
             "trending_hashtags": trending_hashtags
         }
@@ -1,5 +1,5 @@
  
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, BigInteger, Double
 from database import Base
 
 class User(Base):
@@ -56,6 +56,44 @@ class Follow(Base):
     __tablename__ = "follows"
     id = Column(Integer, primary_key=True)
 
+class PostTerm(Base):
+    __tablename__ = "post_terms"
+    term = Column(String(100), primary_key=True)
+    postId = Column(Integer, primary_key=True, index=True)
+    weight = Column(Integer, default=1)
+
+class TimelineEntry(Base):
+    __tablename__ = "timelines"
+    ownerUsername = Column(String(100), primary_key=True)
+    postId = Column(Integer, primary_key=True, index=True)
+
+# row count rollup, kept current by the API (see stats.py)
+class TableStat(Base):
+    __tablename__ = "table_stats"
+    name = Column(String(50), primary_key=True)
+    rowCount = Column(BigInteger, default=0)
+    refreshedAt = Column(BigInteger)
+
+# time-decayed leaderboard kept by the API (API/trending.py)
+class TrendingScore(Base):
+    __tablename__ = "trending_scores"
+    postId = Column(Integer, primary_key=True)
+    era = Column(Integer, default=0)
+    score = Column(Double, default=0)
+
+class PostHashtag(Base):
+    __tablename__ = "post_hashtags"
+    tag = Column(String(100), primary_key=True)
+    postId = Column(Integer, primary_key=True, index=True)
+    timestamp = Column(BigInteger)
+    bucket = Column(Integer)
+
+class HashtagBucket(Base):
+    __tablename__ = "hashtag_buckets"
+    bucket = Column(Integer, primary_key=True)
+    tag = Column(String(100), primary_key=True)
+    count = Column(Integer, default=0)
+
 class Message(Base):
     __tablename__ = "messages"
     id = Column(Integer, primary_key=True)
@@ -68,4 +106,12 @@ class Notification(Base):
 
 class ChatRequest(Base):
     __tablename__ = "chat_requests"
-    id = Column(Integer, primary_key=True)
\ No newline at end of file
+    id = Column(Integer, primary_key=True)
+
+
+# the API's user cache drops entries listed here
+class CacheInvalidation(Base):
+    __tablename__ = "cache_invalidations"
+    id = Column(Integer, primary_key=True)
+    username = Column(String(100), nullable=True)
+    timestamp = Column(BigInteger)
@@ -0,0 +1,78 @@
+import re
+
+from sqlalchemy import case, desc, func, or_
+
+import models
+
+# Search over the post_terms inverted index maintained by the API.
+# Keep the tokenizer in sync with API/post_search.py.
+
+TERM_MAX_LENGTH = 100
+HASHTAG_WEIGHT = 3
+
+TOKEN_RE = re.compile(r"#?\w+")
+
+
+def tokenize(text: str) -> dict:
+    weights = {}
+
+    for token in TOKEN_RE.findall((text or "").lower()):
+        if token.startswith("#"):
+            terms = [(token, HASHTAG_WEIGHT), (token[1:], 1)]
+        else:
+            terms = [(token, 1)]
+
+        for term, weight in terms:
+            if len(term) < 2:
+                continue
+            term = term[:TERM_MAX_LENGTH]
+            weights[term] = weights.get(term, 0) + weight
+
+    return weights
+
+
+def unindex_post(db, post_id: int):
+    db.query(models.PostTerm).filter(
+        models.PostTerm.postId == post_id
+    ).delete(synchronize_session=False)
+
+
+def search(db, q: str, page: int, page_size: int):
+    # returns (posts, has_next); posts matching more terms rank first,
+    # then by summed weight (hashtags weigh more), then newest
+    tokens = list(tokenize(q))
+    if not tokens:
+        return [], False
+
+    # the last word may still be being typed: match it as a prefix
+    *complete, last = tokens
+    exact = complete + [f"@{t}" for t in complete]
+
+    # one condition per query word; a word can match several index rows
+    # (prefix, "@author" variant), so count words matched, not rows
+    conditions = [models.PostTerm.term.in_([t, f"@{t}"]) for t in complete] + [
+        or_(
+            models.PostTerm.term.startswith(last, autoescape=True),
+            models.PostTerm.term.startswith(f"@{last}", autoescape=True)
+        )
+    ]
+
+    matched = sum(func.max(case((condition, 1), else_=0)) for condition in conditions)
+    score = func.sum(models.PostTerm.weight)
+
+    rows = db.query(models.PostTerm.postId).filter(
+        or_(*conditions)
+    ).group_by(
+        models.PostTerm.postId
+    ).order_by(
+        desc(matched), desc(score), desc(models.PostTerm.postId)
+    ).offset((page - 1) * page_size).limit(page_size + 1).all()
+
+    has_next = len(rows) > page_size
+    ids = [r.postId for r in rows[:page_size]]
+    if not ids:
+        return [], False
+
+    posts = {p.id: p for p in db.query(models.Post).filter(models.Post.id.in_(ids)).all()}
+
+    return [posts[i] for i in ids if i in posts], has_next
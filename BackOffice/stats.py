@@ -0,0 +1,88 @@
+import time
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import models
+
+# Row counts for the dashboards, read from the table_stats rollup that the
+# API keeps current with deltas from its write paths. A table is only
+# recounted once its last recount is older than the staleness bound:
+#   "exact"        SELECT COUNT(*) (scans an index on InnoDB)
+#   "approximate"  InnoDB's estimate from information_schema, instant but
+#                  can be off by a few tens of percent
+
+STATS_MODE = "exact"
+STATS_MAX_AGE_SECONDS = 600
+MODES = ("exact", "approximate")
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _exact_count(db: Session, table: str) -> int:
+    return db.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar() or 0
+
+
+def _estimated_counts(db: Session, tables: list[str]) -> dict:
+    if db.get_bind().dialect.name != "mysql":
+        return {t: _exact_count(db, t) for t in tables}
+
+    rows = db.execute(
+        text(
+            "SELECT TABLE_NAME, TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN :names"
+        ).bindparams(bindparam("names", expanding=True)),
+        {"names": tables}
+    ).all()
+
+    estimates = {name: int(count or 0) for name, count in rows}
+    return {t: estimates.get(t, 0) for t in tables}
+
+
+def get_counts(db: Session, tables: list[str], mode: str = STATS_MODE,
+               max_age_seconds: int = STATS_MAX_AGE_SECONDS) -> dict:
+    if mode not in MODES:
+        raise ValueError(f"Unknown stats mode: {mode}")
+
+    rows = {
+        r.name: r
+        for r in db.query(models.TableStat).filter(models.TableStat.name.in_(tables)).all()
+    }
+
+    now = _now_ms()
+    cutoff = now - max_age_seconds * 1000
+    stale = [t for t in tables if t not in rows or (rows[t].refreshedAt or 0) <= cutoff]
+
+    if stale:
+        if mode == "exact":
+            fresh = {t: _exact_count(db, t) for t in stale}
+        else:
+            fresh = _estimated_counts(db, stale)
+
+        for table, count in fresh.items():
+            row = rows.get(table)
+            if row is None:
+                row = rows[table] = models.TableStat(name=table)
+                db.add(row)
+            row.rowCount = count
+            row.refreshedAt = now
+
+        try:
+            db.commit()
+        except IntegrityError:
+            # another page view created the same rows first, ours are still fine to show
+            db.rollback()
+
+    return {t: int(rows[t].rowCount or 0) for t in tables}
+
+
+def adjust(db: Session, table: str, delta: int):
+    # for BackOffice deletes, committed with the caller's change
+    if delta:
+        db.query(models.TableStat).filter(models.TableStat.name == table).update(
+            {"rowCount": models.TableStat.rowCount + delta},
+            synchronize_session=False
+        )
@@ -0,0 +1,152 @@
+import argparse
+import asyncio
+import importlib
+import json
+import os
+
+# python -m benchmarks --db sqlite:///bench.db seed --reset
+# python -m benchmarks --db sqlite:///bench.db run --mix mixed --out base.json
+# python -m benchmarks run  --url http://127.0.0.1:8000 --baseline base.json
+# python -m benchmarks --db sqlite:///bench.db serialization --rows 1000
+
+DEFAULT_APP = "API.main:app"
+DEFAULT_MANIFEST = "benchmark_dataset.json"
+
+
+def _use_database(url: str):
+    # the app reads its engine settings from the environment at import time
+    if url:
+        os.environ["DATABASE_URL"] = url
+
+
+def cmd_seed(args):
+    _use_database(args.db)
+
+    from .dataset import DatasetConfig, seed
+
+    cfg = DatasetConfig(
+        users=args.users,
+        avg_follows=args.avg_follows,
+        posts_per_user=args.posts_per_user,
+        likes_per_post=args.likes_per_post,
+        comments_per_post=args.comments_per_post,
+        conversations=args.conversations,
+        messages_per_conversation=args.messages_per_conversation,
+        seed=args.seed
+    )
+
+    manifest = seed(args.app, cfg, args.manifest, reset=args.reset)
+    print(json.dumps({"counts": manifest["counts"], "seedSeconds": manifest["seedSeconds"]}, indent=2))
+
+
+async def _run_in_process(args, manifest: dict):
+    import httpx
+
+    from .workload import run
+
+    module, attr = args.app.split(":")
+    app = getattr(importlib.import_module(module), attr)
+
+    # lifespan too, so the counter flusher runs like in production
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            return await run(client, manifest, args.mix, args.concurrency, args.duration, args.requests, args.seed)
+
+
+async def _run_http(args, manifest: dict):
+    import httpx
+
+    from .workload import run
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        return await run(client, manifest, args.mix, args.concurrency, args.duration, args.requests, args.seed)
+
+
+def cmd_run(args):
+    _use_database(args.db)
+
+    from . import report
+
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+
+    if args.url:
+        recorder = asyncio.run(_run_http(args, manifest))
+    else:
+        recorder = asyncio.run(_run_in_process(args, manifest))
+
+    result = report.summarize(recorder, {
+        "mode": "http" if args.url else "in-process",
+        "mix": args.mix,
+        "concurrency": args.concurrency,
+        "dataset": manifest["counts"],
+    })
+
+    baseline = report.load(args.baseline) if args.baseline else None
+    print(report.format_table(result, baseline))
+
+    if args.out:
+        report.save(result, args.out)
+
+
+def cmd_serialization(args):
+    _use_database(args.db)
+
+    from . import report, serialization
+
+    result = serialization.measure(args.app, args.rows, args.repeat)
+    print(serialization.format_table(result))
+
+    if args.out:
+        report.save(result, args.out)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--app", default=DEFAULT_APP, help="import string of the FastAPI app")
+    parser.add_argument("--db", help="database URL (sets DATABASE_URL), e.g. sqlite:///bench.db")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST, help="dataset description written by seed")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    s = sub.add_parser("seed", help="create a synthetic dataset")
+    s.add_argument("--users", type=int)
+    s.add_argument("--avg-follows", type=int)
+    s.add_argument("--posts-per-user", type=int)
+    s.add_argument("--likes-per-post", type=int)
+    s.add_argument("--comments-per-post", type=int)
+    s.add_argument("--conversations", type=int)
+    s.add_argument("--messages-per-conversation", type=int)
+    s.add_argument("--seed", type=int)
+    s.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    s.set_defaults(func=cmd_seed)
+
+    from .workload import MIXES
+
+    r = sub.add_parser("run", help="drive the app and report latencies per route")
+    r.add_argument("--url", help="benchmark a running server over HTTP instead of in-process")
+    r.add_argument("--mix", default="mixed", choices=sorted(MIXES))
+    r.add_argument("--concurrency", type=int, default=20, help="virtual users")
+    r.add_argument("--duration", type=float, default=30, help="seconds")
+    r.add_argument("--requests", type=int, help="stop after this many scenario iterations")
+    r.add_argument("--timeout", type=float, default=30, help="HTTP timeout, seconds")
+    r.add_argument("--seed", type=int, default=1)
+    r.add_argument("--out", help="save the results as JSON")
+    r.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    r.set_defaults(func=cmd_run)
+
+    from .serialization import DEFAULT_REPEAT, DEFAULT_ROWS
+
+    j = sub.add_parser("serialization", help="CPU per 1,000 rows, ORM + response_model vs the fast JSON path")
+    j.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="rows per response")
+    j.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    j.add_argument("--out", help="save the results as JSON")
+    j.set_defaults(func=cmd_serialization)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
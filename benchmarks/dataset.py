@@ -0,0 +1,286 @@
+import importlib
+import json
+import random
+import time
+import uuid
+from types import SimpleNamespace
+
+from sqlalchemy import func, insert
+
+# Synthetic dataset for the benchmarks: users, a power-law follow graph
+# (a few accounts with most of the followers, like the real thing), posts,
+# likes, comments, notifications and chat histories between mutual follows.
+# Rows go in with bulk INSERTs, then the app's own helpers build the derived
+# tables (timelines, inbox summaries, counters, search and hashtag indexes).
+
+DAY_MS = 24 * 3600 * 1000
+INSERT_CHUNK_SIZE = 5000
+
+FOLLOW_ZIPF_EXPONENT = 1.0      # popularity skew of follow targets
+FOLLOW_PARETO_SHAPE = 1.5       # skew of how many accounts each user follows
+POSTS_PARETO_SHAPE = 2.0        # skew of how much each user posts
+
+WORDS = (
+    "sunset beach coffee weekend friends travel music food city night "
+    "morning gym book movie summer rain football study work party"
+).split()
+
+
+class DatasetConfig(SimpleNamespace):
+
+    def __init__(self, **overrides):
+        super().__init__(
+            users=1000,
+            avg_follows=30,
+            posts_per_user=5,
+            likes_per_post=10,
+            comments_per_post=2,
+            conversations=2000,
+            messages_per_conversation=20,
+            days=30,
+            seed=42
+        )
+        for key, value in overrides.items():
+            if value is not None:
+                setattr(self, key, value)
+
+
+def load_app(app_path: str) -> SimpleNamespace:
+    # "API.main:app" -> the API package's modules, imported after DATABASE_URL is set
+    package = app_path.split(":")[0].rsplit(".", 1)[0]
+
+    modules = SimpleNamespace()
+    for name in ("database", "models", "timeline", "conversations", "counters", "follower_counts", "post_search", "hashtags"):
+        setattr(modules, name, importlib.import_module(f"{package}.{name}"))
+    return modules
+
+
+# -------------------------
+# GENERATION
+# -------------------------
+
+def _sample_weighted(rng: random.Random, population: list, cum_weights: list, k: int, exclude) -> set:
+    picked = set()
+    attempts = 0
+
+    while len(picked) < k and attempts < 4 * k + 10:
+        for item in rng.choices(population, cum_weights=cum_weights, k=k - len(picked)):
+            if item != exclude:
+                picked.add(item)
+        attempts += k
+
+    return picked
+
+
+def _caption(rng: random.Random) -> str:
+    words = rng.sample(WORDS, rng.randint(3, 8))
+    tags = [f"#{w}" for w in rng.sample(WORDS, rng.randint(0, 2))]
+    return " ".join(words + tags)
+
+
+def generate(cfg: DatasetConfig, first_post_id: int, first_message_id: int) -> dict:
+    rng = random.Random(cfg.seed)
+    now = int(time.time() * 1000)
+
+    usernames = [f"user{i}" for i in range(cfg.users)]
+
+    # popularity rank is a random permutation, not the user number
+    by_popularity = usernames[:]
+    rng.shuffle(by_popularity)
+    cum_weights = []
+    total = 0.0
+    for rank in range(cfg.users):
+        total += 1 / (rank + 1) ** FOLLOW_ZIPF_EXPONENT
+        cum_weights.append(total)
+
+    # each user follows a Pareto-distributed number of accounts
+    pareto_mean = FOLLOW_PARETO_SHAPE / (FOLLOW_PARETO_SHAPE - 1)
+    follows = set()
+    for username in usernames:
+        k = int(rng.paretovariate(FOLLOW_PARETO_SHAPE) * cfg.avg_follows / pareto_mean)
+        k = max(1, min(k, cfg.users - 1))
+        for followed in _sample_weighted(rng, by_popularity, cum_weights, k, username):
+            follows.add((username, followed))
+
+    follower_counts = {}
+    for _, followed in follows:
+        follower_counts[followed] = follower_counts.get(followed, 0) + 1
+    avg_followers = max(len(follows) / max(cfg.users, 1), 1)
+
+    posts = []
+    posts_mean = POSTS_PARETO_SHAPE / (POSTS_PARETO_SHAPE - 1)
+    for username in usernames:
+        count = int(rng.paretovariate(POSTS_PARETO_SHAPE) * cfg.posts_per_user / posts_mean)
+        for _ in range(count):
+            posts.append({
+                "id": first_post_id + len(posts),
+                "username": username,
+                "caption": _caption(rng),
+                "imageUri": None,
+                "imageResId": None,
+                "likeCount": 0,
+                "commentCount": 0,
+                "isLiked": False,
+                "timestamp": now - int(rng.random() * cfg.days * DAY_MS)
+            })
+
+    likes, comments, notifications = [], [], []
+    for post in posts:
+        # popular authors get more engagement
+        reach = (1 + follower_counts.get(post["username"], 0) / avg_followers) / 2
+
+        n_likes = min(int(rng.expovariate(1 / cfg.likes_per_post) * reach), cfg.users)
+        for liker in rng.sample(usernames, n_likes):
+            likes.append({"postId": post["id"], "username": liker})
+            notifications.append({
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "username": liker,
+                "message": f"{liker} liked your post",
+                "timestamp": post["timestamp"] + rng.randint(0, DAY_MS),
+                "seen": rng.random() < 0.7,
+                "type": "like",
+                "targetUsername": post["username"]
+            })
+
+        n_comments = int(rng.expovariate(1 / cfg.comments_per_post) * reach) if cfg.comments_per_post else 0
+        for _ in range(n_comments):
+            commenter = rng.choice(usernames)
+            ts = post["timestamp"] + rng.randint(0, DAY_MS)
+            comments.append({
+                "postId": post["id"],
+                "username": commenter,
+                "text": " ".join(rng.sample(WORDS, 4)),
+                "timestamp": ts
+            })
+            notifications.append({
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "username": commenter,
+                "message": f"{commenter} commented on your post",
+                "timestamp": ts,
+                "seen": rng.random() < 0.7,
+                "type": "comment",
+                "targetUsername": post["username"]
+            })
+
+    # chats run along follow edges, made mutual so the send route accepts them
+    edges = sorted(follows)
+    pairs = set()
+    for follower, followed in rng.sample(edges, min(cfg.conversations, len(edges))):
+        pairs.add(tuple(sorted((follower, followed))))
+        follows.add((followed, follower))
+
+    messages = []
+    for a, b in sorted(pairs):
+        ts = now - int(rng.random() * cfg.days * DAY_MS)
+        for n in range(cfg.messages_per_conversation):
+            sender, receiver = (a, b) if rng.random() < 0.5 else (b, a)
+            ts += rng.randint(1000, 3600 * 1000)
+            messages.append({
+                "id": first_message_id + len(messages),
+                "sender": sender,
+                "receiver": receiver,
+                "message": " ".join(rng.sample(WORDS, rng.randint(1, 6))),
+                "timestamp": ts,
+                "isVoice": False,
+                "emoji": None,
+                "isRead": n < cfg.messages_per_conversation - 3,
+                "conversationKey": f"{a}|{b}"
+            })
+
+    users = [
+        {
+            "username": u,
+            "fullName": f"User {u[4:]} {rng.choice(WORDS).title()}",
+            "password": "bench",
+            "bio": "",
+            "dob": "",
+            "profileImageUri": None,
+            "profileImageResId": None,
+            "role": "user",
+            "is_banned": False
+        }
+        for u in usernames
+    ]
+
+    return {
+        "now": now,
+        "users": users,
+        "follows": [{"followerUsername": a, "followedUsername": b} for a, b in sorted(follows)],
+        "posts": posts,
+        "likes": likes,
+        "comments": comments,
+        "notifications": notifications,
+        "messages": messages,
+        "pairs": sorted(pairs)
+    }
+
+
+# -------------------------
+# SEEDING
+# -------------------------
+
+def _insert(db, model, rows: list):
+    for i in range(0, len(rows), INSERT_CHUNK_SIZE):
+        db.execute(insert(model), rows[i:i + INSERT_CHUNK_SIZE])
+    db.commit()
+
+
+def seed(app_path: str, cfg: DatasetConfig, manifest_path: str, reset: bool = False) -> dict:
+    app = load_app(app_path)
+    models = app.models
+    engine = app.database.engine
+
+    if reset:
+        app.database.Base.metadata.drop_all(bind=engine)
+    app.database.Base.metadata.create_all(bind=engine)
+
+    db = app.database.SessionLocal()
+    try:
+        first_post_id = (db.query(func.max(models.Post.id)).scalar() or 0) + 1
+        first_message_id = (db.query(func.max(models.ChatMessage.id)).scalar() or 0) + 1
+
+        t0 = time.perf_counter()
+        data = generate(cfg, first_post_id, first_message_id)
+
+        _insert(db, models.User, data["users"])
+        _insert(db, models.Follow, data["follows"])
+        _insert(db, models.Post, data["posts"])
+        _insert(db, models.PostLike, data["likes"])
+        _insert(db, models.Comment, data["comments"])
+        _insert(db, models.Notification, data["notifications"])
+        _insert(db, models.ChatMessage, data["messages"])
+
+        # derived tables, through the same code the API uses;
+        # follower counts first, fan-out reads them
+        app.follower_counts.reconcile(db)
+        for post in data["posts"]:
+            app.timeline.fan_out_post(db, SimpleNamespace(**post))
+        db.commit()
+
+        app.conversations.rebuild_summaries(db)
+        app.counters.reconcile(db)
+        app.post_search.rebuild(db)
+        app.hashtags.rebuild(db)
+
+        elapsed = time.perf_counter() - t0
+    finally:
+        db.close()
+
+    manifest = {
+        "app": app_path,
+        "seededAt": data["now"],
+        "config": vars(cfg),
+        "users": [u["username"] for u in data["users"]],
+        "postIds": [first_post_id, first_post_id + len(data["posts"]) - 1],
+        "conversations": data["pairs"],
+        "counts": {
+            name: len(data[name])
+            for name in ("users", "follows", "posts", "likes", "comments", "notifications", "messages")
+        },
+        "seedSeconds": round(elapsed, 2)
+    }
+
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
+
+    return manifest
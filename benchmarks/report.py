@@ -0,0 +1,90 @@
+import json
+import math
+
+from .workload import Recorder
+
+# Per-route latency percentiles and throughput, saved as JSON so a later run
+# can be compared against it (--baseline).
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    # nearest-rank
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(recorder: Recorder, meta: dict) -> dict:
+    elapsed = max(recorder.finished - recorder.started, 1e-9)
+    routes = {}
+
+    for route, samples in recorder.samples.items():
+        values = sorted(samples)
+        stats = {
+            "count": len(values),
+            "errors": recorder.errors.get(route, 0),
+            "rps": round(len(values) / elapsed, 2),
+            "meanMs": round(sum(values) / len(values) * 1000, 2),
+        }
+        for p in PERCENTILES:
+            stats[f"p{p}Ms"] = round(percentile(values, p) * 1000, 2)
+        routes[route] = stats
+
+    total = sum(s["count"] for s in routes.values())
+    return {
+        **meta,
+        "elapsedSeconds": round(elapsed, 2),
+        "requests": total,
+        "errors": sum(s["errors"] for s in routes.values()),
+        "throughput": round(total / elapsed, 2),
+        "routes": routes,
+    }
+
+
+def _delta(new: float, old: float) -> str:
+    if not old:
+        return ""
+    return f"{(new - old) / old * 100:+.0f}%"
+
+
+def format_table(result: dict, baseline: dict = None) -> str:
+    header = f"{'route':<48} {'count':>7} {'err':>5} {'rps':>8} {'mean':>8}" + "".join(
+        f" {'p' + str(p):>8}" for p in PERCENTILES
+    )
+    lines = [header, "-" * len(header)]
+
+    old_routes = (baseline or {}).get("routes", {})
+    for route, s in sorted(result["routes"].items(), key=lambda item: -item[1]["count"]):
+        line = f"{route:<48} {s['count']:>7} {s['errors']:>5} {s['rps']:>8} {s['meanMs']:>8}" + "".join(
+            f" {s[f'p{p}Ms']:>8}" for p in PERCENTILES
+        )
+        lines.append(line)
+
+        old = old_routes.get(route)
+        if old:
+            lines.append(f"{'  vs baseline':<48} {'':>7} {'':>5} {_delta(s['rps'], old['rps']):>8} "
+                         f"{_delta(s['meanMs'], old['meanMs']):>8}" + "".join(
+                             f" {_delta(s[f'p{p}Ms'], old[f'p{p}Ms']):>8}" for p in PERCENTILES
+                         ))
+
+    lines.append("-" * len(header))
+    summary = f"{result['requests']} requests, {result['errors']} errors, {result['throughput']} req/s over {result['elapsedSeconds']}s"
+    if baseline:
+        summary += f" (baseline {baseline['throughput']} req/s, {_delta(result['throughput'], baseline['throughput'])})"
+    lines.append(summary)
+    lines.append("latencies in ms")
+
+    return "\n".join(lines)
+
+
+def save(result: dict, path: str):
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2)
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,137 @@
+import importlib
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+# CPU cost of turning list responses into JSON, per 1,000 rows:
+#   orm  - full entities + response_model validation + JSONResponse, the default path
+#   fast - column projection + plain dicts + serialization.dumps (FAST_JSON_ROUTES)
+# Both sides run the same helpers the routes use, each repetition on a fresh
+# session so the identity map starts cold like in a request. Process CPU time
+# includes the driver; with sqlite it also includes the database itself.
+
+DEFAULT_ROWS = 1000
+DEFAULT_REPEAT = 20
+
+
+def _json_response(content) -> bytes:
+    # what Starlette's JSONResponse renders
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _validated(adapter: TypeAdapter, content) -> bytes:
+    # FastAPI with response_model: validate, dump in json mode, render
+    value = adapter.validate_python(content, from_attributes=True)
+    return _json_response(adapter.dump_python(value, mode="json"))
+
+
+def _cases(app, rows: int) -> dict:
+    models, schemas, feed, chat, serialization = app.models, app.schemas, app.feed, app.chat, app.serialization
+
+    page_adapter = TypeAdapter(schemas.PostPage)
+    comments_adapter = TypeAdapter(list[schemas.CommentOut])
+
+    def feed_orm(db):
+        return _validated(page_adapter, feed.build_page(db, db.query(models.Post), "", None, rows))
+
+    def feed_fast(db):
+        page = feed.build_row_page(db, db.query(*serialization.POST_COLUMNS), "", None, rows)
+        return serialization.dumps(page)
+
+    def comments_orm(db):
+        return _validated(comments_adapter, db.query(models.Comment).limit(rows).all())
+
+    def comments_fast(db):
+        result = db.query(*serialization.COMMENT_COLUMNS).limit(rows).all()
+        return serialization.dumps(serialization.rows_to_dicts(result, serialization.COMMENT_COLUMNS))
+
+    # the conversation route has no response_model, FastAPI runs jsonable_encoder
+    def chat_orm(db):
+        msgs = db.query(models.ChatMessage).order_by(models.ChatMessage.id.desc()).limit(rows).all()
+        return _json_response(jsonable_encoder([chat.message_to_dict(m) for m in msgs]))
+
+    def chat_fast(db):
+        msgs = db.query(*serialization.MESSAGE_COLUMNS).order_by(models.ChatMessage.id.desc()).limit(rows).all()
+        return serialization.dumps([chat.message_to_dict(m) for m in msgs])
+
+    return {
+        "feed": (feed_orm, feed_fast, lambda payload: len(payload["items"])),
+        "comments": (comments_orm, comments_fast, len),
+        "chat history": (chat_orm, chat_fast, len),
+    }
+
+
+def _cpu_ms(session_factory, fn, repeat: int) -> float:
+    spent = 0.0
+    for _ in range(repeat):
+        db = session_factory()
+        try:
+            start = time.process_time()
+            fn(db)
+            spent += time.process_time() - start
+        finally:
+            db.close()
+    return spent * 1000 / repeat
+
+
+def measure(app_path: str, rows: int = DEFAULT_ROWS, repeat: int = DEFAULT_REPEAT) -> dict:
+    package = app_path.split(":")[0].rsplit(".", 1)[0]
+
+    app = type("App", (), {})()
+    for name in ("database", "models", "schemas", "feed", "serialization"):
+        setattr(app, name, importlib.import_module(f"{package}.{name}"))
+    app.chat = importlib.import_module(f"{package}.routers.chat")
+
+    results = {}
+    for name, (orm, fast, count) in _cases(app, rows).items():
+        db = app.database.SessionLocal()
+        try:
+            # warm up, and both paths must produce the same payload
+            orm_payload, fast_payload = json.loads(orm(db)), json.loads(fast(db))
+        finally:
+            db.close()
+
+        n = count(orm_payload)
+        if not n:
+            results[name] = {"rows": 0}
+            continue
+
+        orm_ms = _cpu_ms(app.database.SessionLocal, orm, repeat)
+        fast_ms = _cpu_ms(app.database.SessionLocal, fast, repeat)
+        per_k = 1000 / n
+
+        results[name] = {
+            "rows": n,
+            "samePayload": orm_payload == fast_payload,
+            "ormMsPer1k": round(orm_ms * per_k, 2),
+            "fastMsPer1k": round(fast_ms * per_k, 2),
+            "savedMsPer1k": round((orm_ms - fast_ms) * per_k, 2),
+            "savedPercent": round((orm_ms - fast_ms) / orm_ms * 100, 1) if orm_ms else 0.0,
+        }
+
+    return {
+        "encoder": "orjson" if app.serialization.orjson is not None else "json",
+        "repeat": repeat,
+        "cases": results,
+    }
+
+
+def format_table(result: dict) -> str:
+    header = f"{'response':<16} {'rows':>6} {'orm':>9} {'fast':>9} {'saved':>9} {'saved%':>7}  same"
+    lines = [header, "-" * len(header)]
+
+    for name, c in result["cases"].items():
+        if not c["rows"]:
+            lines.append(f"{name:<16} {0:>6}  (no rows, seed a dataset first)")
+            continue
+        lines.append(
+            f"{name:<16} {c['rows']:>6} {c['ormMsPer1k']:>9} {c['fastMsPer1k']:>9} "
+            f"{c['savedMsPer1k']:>9} {c['savedPercent']:>6}%  {'yes' if c['samePayload'] else 'NO'}"
+        )
+
+    lines.append("-" * len(header))
+    lines.append(f"CPU ms per 1,000 rows, mean of {result['repeat']} runs, encoder: {result['encoder']}")
+
+    return "\n".join(lines)
@@ -0,0 +1,235 @@
+import asyncio
+import random
+import time
+
+# Request mixes that mimic the Android screens. Every virtual user loops
+# over weighted scenarios; each request is timed and recorded under its
+# route template so the report groups /posts/timeline/user1 and
+# /posts/timeline/user2 together.
+
+
+class Recorder:
+
+    def __init__(self):
+        self.samples = {}       # route -> list of latencies (seconds)
+        self.errors = {}        # route -> count of non-2xx / transport errors
+        self.started = None
+        self.finished = None
+
+    def add(self, route: str, seconds: float, ok: bool):
+        self.samples.setdefault(route, []).append(seconds)
+        if not ok:
+            self.errors[route] = self.errors.get(route, 0) + 1
+
+
+class VirtualUser:
+
+    def __init__(self, manifest: dict, rng: random.Random, client, recorder: Recorder):
+        self.rng = rng
+        self.client = client
+        self.recorder = recorder
+        self.manifest = manifest
+
+        self.username = rng.choice(manifest["users"])
+        partners = [
+            b if a == self.username else a
+            for a, b in manifest["conversations"]
+            if self.username in (a, b)
+        ]
+        self.partner = rng.choice(partners) if partners else None
+
+        self.feed_cursor = None
+        self.last_message_id = 0
+        self.notifications_since = 0
+        self.seen_posts = []
+
+    def random_user(self) -> str:
+        return self.rng.choice(self.manifest["users"])
+
+    def random_post(self) -> int:
+        if self.seen_posts and self.rng.random() < 0.8:
+            return self.rng.choice(self.seen_posts)
+        low, high = self.manifest["postIds"]
+        return self.rng.randint(low, max(low, high))
+
+    async def send(self, route: str, method: str, url: str, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            ok = response.status_code < 400
+        except Exception:
+            response, ok = None, False
+
+        self.recorder.add(route, time.perf_counter() - t0, ok)
+        return response if ok else None
+
+
+# -------------------------
+# SCENARIOS (one screen interaction each)
+# -------------------------
+
+async def home_timeline(vu: VirtualUser):
+    # first page, sometimes scrolls to the next one
+    params = {"limit": 20}
+    if vu.feed_cursor and vu.rng.random() < 0.4:
+        params["before"] = vu.feed_cursor
+
+    r = await vu.send("GET /posts/timeline/{username}", "GET", f"/posts/timeline/{vu.username}", params=params)
+    if r is not None:
+        page = r.json()
+        vu.feed_cursor = page.get("nextCursor")
+        vu.seen_posts = [p["id"] for p in page.get("items", [])] or vu.seen_posts
+
+
+async def global_feed(vu: VirtualUser):
+    await vu.send("GET /posts/feed/{username}", "GET", f"/posts/feed/{vu.username}", params={"limit": 20})
+
+
+async def like_toggle(vu: VirtualUser):
+    post_id = vu.random_post()
+    await vu.send("POST /likes/{postId}/{username}", "POST", f"/likes/{post_id}/{vu.username}")
+
+    if vu.rng.random() < 0.3:
+        await vu.send("DELETE /likes/{postId}/{username}", "DELETE", f"/likes/{post_id}/{vu.username}")
+
+
+async def open_comments(vu: VirtualUser):
+    post_id = vu.random_post()
+    await vu.send("GET /comments/{post_id}", "GET", f"/comments/{post_id}")
+
+    if vu.rng.random() < 0.25:
+        await vu.send("POST /comments/", "POST", "/comments/", json={
+            "postId": post_id,
+            "username": vu.username,
+            "text": "benchmark comment",
+            "timestamp": int(time.time() * 1000)
+        })
+
+
+async def view_profile(vu: VirtualUser):
+    other = vu.random_user()
+    await vu.send("GET /users/{username}", "GET", f"/users/{other}")
+    await vu.send("GET /posts/user/{username}", "GET", f"/posts/user/{other}")
+    await vu.send("GET /follows/followerCount/{username}", "GET", f"/follows/followerCount/{other}")
+    await vu.send("GET /follows/isFollowing/{follower}/{followed}", "GET", f"/follows/isFollowing/{vu.username}/{other}")
+
+
+async def chat_poll(vu: VirtualUser):
+    # open chat screen polling for new messages
+    if vu.partner is None:
+        return await inbox(vu)
+
+    r = await vu.send("GET /chat/conversation", "GET", "/chat/conversation", params={
+        "user1": vu.username,
+        "user2": vu.partner,
+        "since_id": vu.last_message_id,
+        "limit": 50
+    })
+    if r is not None:
+        messages = r.json()
+        if messages:
+            vu.last_message_id = messages[-1]["id"]
+
+
+async def chat_send(vu: VirtualUser):
+    if vu.partner is None:
+        return
+
+    await vu.send("POST /chat/send", "POST", "/chat/send", json={
+        "sender": vu.username,
+        "receiver": vu.partner,
+        "message": "benchmark message",
+        "timestamp": int(time.time() * 1000),
+        "isVoice": False
+    })
+    await vu.send("POST /chat/mark-read", "POST", "/chat/mark-read", params={
+        "sender": vu.partner,
+        "receiver": vu.username
+    })
+
+
+async def inbox(vu: VirtualUser):
+    await vu.send("GET /chat/inbox/{username}", "GET", f"/chat/inbox/{vu.username}")
+    await vu.send("GET /chat/unread/total/{username}", "GET", f"/chat/unread/total/{vu.username}")
+
+
+async def notifications_poll(vu: VirtualUser):
+    # timeout=0: measure the query, not the long-poll wait
+    r = await vu.send("GET /notifications/{username}/poll", "GET", f"/notifications/{vu.username}/poll", params={
+        "since": vu.notifications_since,
+        "timeout": 0
+    })
+    if r is not None:
+        for n in r.json():
+            vu.notifications_since = max(vu.notifications_since, n["seq"])
+
+
+async def search_users(vu: VirtualUser):
+    q = vu.random_user()[:vu.rng.randint(2, 6)]
+    await vu.send("GET /users/search", "GET", "/users/search", params={"query": q})
+
+
+async def explore(vu: VirtualUser):
+    await vu.send("GET /explore/trending", "GET", "/explore/trending", params={"viewer": vu.username})
+    await vu.send("GET /posts/tags/trending", "GET", "/posts/tags/trending")
+
+
+async def create_post(vu: VirtualUser):
+    await vu.send("POST /posts/", "POST", "/posts/", json={
+        "username": vu.username,
+        "caption": "benchmark post #bench",
+        "timestamp": int(time.time() * 1000)
+    })
+
+
+# (weight, scenario)
+MIXES = {
+    "mixed": [
+        (30, home_timeline), (8, global_feed), (10, like_toggle), (6, open_comments),
+        (6, view_profile), (15, chat_poll), (3, chat_send), (5, inbox),
+        (8, notifications_poll), (3, search_users), (3, explore), (1, create_post),
+    ],
+    "feed": [(70, home_timeline), (20, global_feed), (10, like_toggle)],
+    "chat": [(70, chat_poll), (10, chat_send), (20, inbox)],
+    "notifications": [(100, notifications_poll)],
+    "write": [(40, like_toggle), (20, chat_send), (20, open_comments), (20, create_post)],
+}
+
+
+# -------------------------
+# DRIVER
+# -------------------------
+
+async def _virtual_user(vu: VirtualUser, mix: list, deadline: float, budget: list):
+    weights = [w for w, _ in mix]
+    scenarios = [s for _, s in mix]
+
+    while time.perf_counter() < deadline:
+        if budget is not None:
+            if budget[0] <= 0:
+                return
+            budget[0] -= 1
+
+        scenario = vu.rng.choices(scenarios, weights=weights)[0]
+        await scenario(vu)
+
+
+async def run(client, manifest: dict, mix: str, concurrency: int, duration: float,
+              max_iterations: int = None, seed: int = 1) -> Recorder:
+    recorder = Recorder()
+    rng = random.Random(seed)
+
+    users = [
+        VirtualUser(manifest, random.Random(rng.getrandbits(32)), client, recorder)
+        for _ in range(concurrency)
+    ]
+
+    # shared iteration budget so runs can be sized by work instead of time
+    budget = [max_iterations] if max_iterations else None
+
+    recorder.started = time.perf_counter()
+    deadline = recorder.started + duration
+    await asyncio.gather(*(_virtual_user(vu, MIXES[mix], deadline, budget) for vu in users))
+    recorder.finished = time.perf_counter()
+
+    return recorder
@@ -0,0 +1,50 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# API/ and the BackOffice read DATABASE_URL when they are imported, so point
+# both at a scratch sqlite file before any test module imports them
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(tempfile.gettempdir(), "socialnetwork-tests.db")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.pop("DATABASE_READ_URL", None)
+
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "BackOffice"))     # flat imports (import models)
+
+from API import models                  # noqa: E402
+from API.database import Base, SessionLocal, engine      # noqa: E402
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def make_user(db):
+    def make(username: str) -> models.User:
+        user = models.User(username=username, fullName=username, password="x")
+        db.add(user)
+        db.commit()
+        return user
+    return make
+
+
+@pytest.fixture
+def make_post(db):
+    def make(username: str, caption: str = "", timestamp: int = 0) -> models.Post:
+        post = models.Post(username=username, caption=caption, timestamp=timestamp, likeCount=0, commentCount=0)
+        db.add(post)
+        db.commit()
+        return post
+    return make
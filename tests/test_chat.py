@@ -0,0 +1,25 @@
+from API import follow_graph, models, schemas
+from API.routers.chat import send
+
+
+def message(sender, receiver) -> schemas.ChatMessageCreate:
+    return schemas.ChatMessageCreate(sender=sender, receiver=receiver, message="olá", timestamp=1)
+
+
+def test_chat_is_gated_on_follows_not_on_the_graph(db, make_user, monkeypatch):
+    make_user("ana")
+    make_user("rui")
+
+    # a graph that never hears about the follow below (another worker took it)
+    monkeypatch.setattr(follow_graph, "_graph", None)
+    follow_graph.load(db)
+
+    assert send(db, message("ana", "rui"))["status"] == "request_pending"
+    assert db.query(models.ChatRequest).count() == 1
+
+    db.add(models.Follow(followerUsername="rui", followedUsername="ana"))
+    db.commit()
+
+    sent = send(db, message("ana", "rui"))
+    assert isinstance(sent, models.ChatMessage)
+    assert sent.receiver == "rui"
@@ -0,0 +1,90 @@
+import pytest
+
+from API import follow_graph, models
+
+
+@pytest.fixture
+def graph(db, make_user, monkeypatch):
+    # ana -> rui in follows, loaded into a fresh graph
+    monkeypatch.setattr(follow_graph, "_graph", None)
+    monkeypatch.setattr(follow_graph, "_journal", None)
+
+    for name in ("ana", "rui", "eva"):
+        make_user(name)
+    follow(db, "ana", "rui")
+
+    follow_graph.load(db)
+    return db
+
+
+def follow(db, follower, followed):
+    db.add(models.Follow(followerUsername=follower, followedUsername=followed))
+    db.commit()
+
+
+def unfollow(db, follower, followed):
+    db.query(models.Follow).filter(
+        models.Follow.followerUsername == follower,
+        models.Follow.followedUsername == followed
+    ).delete()
+    db.commit()
+
+
+def test_overlay_adds_and_removes_on_top_of_the_arrays(graph):
+    follow_graph.add("ana", "eva")
+    follow_graph.remove("ana", "rui")
+    follow_graph.add("new", "ana")      # not a node of the arrays yet
+
+    assert follow_graph.follows("ana", "eva")
+    assert not follow_graph.follows("ana", "rui")
+    assert follow_graph.follows("new", "ana")
+
+    # and back again
+    follow_graph.add("ana", "rui")
+    follow_graph.remove("ana", "eva")
+
+    assert follow_graph.follows("ana", "rui")
+    assert not follow_graph.follows("ana", "eva")
+
+
+def test_reload_folds_the_overlay_into_the_arrays(graph):
+    follow(graph, "ana", "eva")
+    follow_graph.add("ana", "eva")
+    unfollow(graph, "ana", "rui")
+    follow_graph.remove("ana", "rui")
+
+    reloaded = follow_graph.load(graph)
+
+    assert follow_graph.follows("ana", "eva")
+    assert not follow_graph.follows("ana", "rui")
+    assert not reloaded.added_out and not reloaded.removed_out
+
+
+def test_writes_during_a_reload_survive_through_the_journal(graph, monkeypatch):
+    build = follow_graph.build
+
+    def build_then_write(db):
+        # the reload has read follows; this worker then commits a follow
+        # and an unfollow that the new arrays don't have
+        result = build(db)
+        follow_graph.add("eva", "ana")
+        follow_graph.remove("ana", "rui")
+        return result
+
+    monkeypatch.setattr(follow_graph, "build", build_then_write)
+    follow_graph.load(graph)
+
+    assert follow_graph.follows("eva", "ana")
+    assert not follow_graph.follows("ana", "rui")
+    assert follow_graph._journal is None
+
+
+def test_mutuals_include_overlay_follows(graph, make_user):
+    make_user("zoe")
+    follow(graph, "rui", "zoe")
+    follow_graph.load(graph)
+
+    follow_graph.add("ana", "eva")
+    follow_graph.add("eva", "zoe")
+
+    assert sorted(follow_graph.mutuals("ana", "zoe")) == ["eva", "rui"]
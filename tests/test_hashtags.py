@@ -0,0 +1,36 @@
+import time
+
+import hashtags as backoffice_hashtags      # BackOffice/hashtags.py (flat imports, see conftest)
+
+from API import hashtags, models
+from API.hashtag_index import BUCKET_MS, bucket_of
+
+
+def test_tags_are_counted_in_the_hour_the_server_received_them(db, make_user, make_post):
+    make_user("ana")
+    next_week = int(time.time() * 1000) + 7 * 24 * BUCKET_MS
+    post = make_post("ana", "#cats from a clock a week ahead", timestamp=next_week)
+
+    hashtags.index_post(db, post)
+    db.commit()
+
+    row = db.query(models.PostHashtag).filter(models.PostHashtag.postId == post.id).one()
+    assert row.bucket == bucket_of()
+    assert row.timestamp == next_week
+
+    assert hashtags.trending(db, hours=1) == [{"tag": "#cats", "count": 1}]
+
+
+def test_backoffice_unindex_takes_the_post_out_of_trending(db, make_user, make_post):
+    make_user("ana")
+    first = make_post("ana", "#cats #dogs")
+    second = make_post("ana", "#cats")
+    hashtags.index_post(db, first)
+    hashtags.index_post(db, second)
+    db.commit()
+
+    backoffice_hashtags.unindex_post(db, first.id)
+    db.commit()
+
+    assert backoffice_hashtags.trending(db, 1, 10) == [{"tag": "#cats", "count": 1}]
+    assert db.query(models.PostHashtag).filter(models.PostHashtag.postId == first.id).count() == 0
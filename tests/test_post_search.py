@@ -0,0 +1,24 @@
+import post_search      # BackOffice/post_search.py (flat imports, see conftest)
+
+from API import post_search as api_post_search
+
+
+def index(db, post):
+    api_post_search.index_post(db, post)
+    db.commit()
+
+
+def test_posts_matching_more_query_words_rank_first(db, make_user, make_post):
+    make_user("ana")
+    prefix_heavy = make_post("ana", "cat catalog category catfish")
+    both_words = make_post("ana", "black cat")
+    index(db, prefix_heavy)
+    index(db, both_words)
+
+    # "cat" is the last word, matched as a prefix by four terms of the first
+    # post; "black" only by the second, which matches both words
+    posts, has_next = post_search.search(db, "black cat", page=1, page_size=10)
+
+    assert [p.id for p in posts] == [both_words.id, prefix_heavy.id]
+    assert not has_next
+
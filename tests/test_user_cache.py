@@ -0,0 +1,46 @@
+import pytest
+
+from API import models, user_cache
+
+
+@pytest.fixture
+def invalidated(monkeypatch):
+    # fresh poll state, every call polls, invalidations recorded in a list
+    seen = []
+    monkeypatch.setattr(user_cache, "INVALIDATION_POLL_SECONDS", 0)
+    monkeypatch.setattr(user_cache, "_last_invalidation_id", None)
+    monkeypatch.setattr(user_cache, "_seen_invalidation_ids", set())
+    monkeypatch.setattr(user_cache, "_next_poll_at", 0.0)
+    monkeypatch.setattr(user_cache, "_listeners", [seen.append])
+    return seen
+
+
+def publish(db, id: int, username: str):
+    db.add(models.CacheInvalidation(id=id, username=username, timestamp=0))
+    db.commit()
+
+
+def test_first_poll_only_sets_the_watermark(db, invalidated):
+    publish(db, 1, "ana")
+    user_cache.sync_invalidations(db)
+
+    assert invalidated == []
+
+    publish(db, 2, "rui")
+    user_cache.sync_invalidations(db)
+    user_cache.sync_invalidations(db)
+
+    assert invalidated == ["rui"]
+
+
+def test_an_id_committed_out_of_order_is_still_applied(db, invalidated):
+    publish(db, 1, "ana")
+    user_cache.sync_invalidations(db)
+
+    # id 3 commits first, id 2 (a slower transaction) after the poll saw 3
+    publish(db, 3, "eva")
+    user_cache.sync_invalidations(db)
+    publish(db, 2, "rui")
+    user_cache.sync_invalidations(db)
+
+    assert invalidated == ["eva", "rui"]